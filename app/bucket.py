@@ -1,73 +1,188 @@
+import asyncio
+import base64
+import hashlib
 import os
-import uuid
-from typing import Optional
-from urllib.parse import urlparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from urllib.parse import unquote, urlparse
 
 from fastapi import UploadFile
-from google.auth.credentials import AnonymousCredentials
-from google.cloud import storage
-from google.oauth2 import service_account
+
+from app.model.image import ImageVariants
+from app.service import images
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+GCS_UPLOAD_WORKERS = int(os.getenv("GCS_UPLOAD_WORKERS", "8"))
+GCS_UPLOAD_TIMEOUT_SECONDS = float(os.getenv("GCS_UPLOAD_TIMEOUT_SECONDS", "30"))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# How clients upload directly to the bucket: "signed" (V4 signed PUT URL, needs service account
+# credentials) or "resumable" (session URL, also works with the fake-gcs emulator).
+GCS_UPLOAD_URL_MODE = os.getenv("GCS_UPLOAD_URL_MODE")
+GCS_UPLOAD_URL_EXPIRATION_SECONDS = int(os.getenv("GCS_UPLOAD_URL_EXPIRATION_SECONDS", "900"))
+
+# The storage client only has a blocking API; its calls run on this pool so uploads
+# do not stall the event loop, and the pool size bounds how many run at once.
+_executor = ThreadPoolExecutor(max_workers=GCS_UPLOAD_WORKERS, thread_name_prefix="gcs")
+
+async def _run_blocking(description: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(_executor, partial(func, *args, **kwargs)),
+            timeout=GCS_UPLOAD_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{description} timed out after {GCS_UPLOAD_TIMEOUT_SECONDS:g}s")
+
+def content_blob_name(digest: str, filename: Optional[str]) -> str:
+    """
+    Name an upload after a hex digest of its bytes, keeping the original extension. Uploads through
+    the API use SHA-256; direct uploads use MD5, the checksum GCS verifies, since their bytes are
+    never seen by the API.
+    """
+    _, extension = os.path.splitext(filename or "")
+    return f"{digest}{extension.lower()}"
+
+def md5_base64_to_hex(md5_base64: str) -> str:
+    # GCS reports md5Hash and takes Content-MD5 in base64
+    return base64.b64decode(md5_base64).hex()
+
+def variant_blob_name(blob_name: str, variant: str) -> str:
+    """Deterministic path of a resized variant: `<original without extension>/<variant>.webp`."""
+    stem, _ = os.path.splitext(blob_name)
+    return f"{stem}/{variant}.{images.VARIANT_EXTENSION}"
 
 
 class GCSBucketManager:
 
     def __init__(self):
-        try:
-            emulator_host = os.getenv("GCP_STORAGE_EMULATOR_HOST")
-
-            if not emulator_host:
-                credentials_info = {
-                    "type": os.getenv("TYPE"),
-                    "project_id": os.getenv("PROJECT_ID"),
-                    "private_key_id": os.getenv("PRIVATE_KEY_ID"),
-                    "private_key": os.getenv("PRIVATE_KEY").replace("\\n", "\n"),
-                    "client_email": os.getenv("CLIENT_EMAIL"),
-                    "client_id": os.getenv("CLIENT_ID"),
-                    "auth_uri": os.getenv("AUTH_URI"),
-                    "token_uri": os.getenv("TOKEN_URI"),
-                    "auth_provider_x509_cert_url": os.getenv("AUTH_PROVIDER_X509_CERT_URL"),
-                    "client_x509_cert_url": os.getenv("CLIENT_X509_CERT_URL"),
-                    "universe_domain": os.getenv("UNIVERSE_DOMAIN"),
-                }
-
-                if not all(credentials_info.values()):
-                    raise RuntimeError("Missing one or more required GCP service account environment variables.")
-
-                credentials = service_account.Credentials.from_service_account_info(credentials_info)
-                client_options = None
-            else:
-                credentials = AnonymousCredentials()
-                client_options = {"api_endpoint": emulator_host}
+        # Nothing is imported or contacted here: google.cloud.storage takes a while to import and
+        # the client is built on first use, or by connect() from the app lifespan.
+        self.emulator_host = os.getenv("GCP_STORAGE_EMULATOR_HOST")
+        self.upload_url_mode = GCS_UPLOAD_URL_MODE or ("resumable" if self.emulator_host else "signed")
+        self.gcp_bucket_name = os.getenv("GCP_BUCKET_NAME")
+        self.storage_client = None
+        self.bucket = None
+        self._configured = False
+        self._disabled = False
+        self._configure_lock = threading.Lock()
+
+    def _configure(self) -> bool:
+        """Build the storage client once. Returns whether GCS is usable."""
+        with self._configure_lock:
+            if self._configured:
+                return self.bucket is not None
+            self._configured = True
+            try:
+                from google.auth.credentials import AnonymousCredentials
+                from google.cloud import storage
+                from google.oauth2 import service_account
+
+                if not self.emulator_host:
+                    credentials_info = {
+                        "type": os.getenv("TYPE"),
+                        "project_id": os.getenv("PROJECT_ID"),
+                        "private_key_id": os.getenv("PRIVATE_KEY_ID"),
+                        "private_key": os.getenv("PRIVATE_KEY").replace("\\n", "\n"),
+                        "client_email": os.getenv("CLIENT_EMAIL"),
+                        "client_id": os.getenv("CLIENT_ID"),
+                        "auth_uri": os.getenv("AUTH_URI"),
+                        "token_uri": os.getenv("TOKEN_URI"),
+                        "auth_provider_x509_cert_url": os.getenv("AUTH_PROVIDER_X509_CERT_URL"),
+                        "client_x509_cert_url": os.getenv("CLIENT_X509_CERT_URL"),
+                        "universe_domain": os.getenv("UNIVERSE_DOMAIN"),
+                    }
+
+                    if not all(credentials_info.values()):
+                        raise RuntimeError("Missing one or more required GCP service account environment variables.")
+
+                    credentials = service_account.Credentials.from_service_account_info(credentials_info)
+                    client_options = None
+                else:
+                    credentials = AnonymousCredentials()
+                    client_options = {"api_endpoint": self.emulator_host}
+
+                self.storage_client = storage.Client(credentials=credentials, client_options=client_options)
+
+                if not self.gcp_bucket_name:
+                    raise ValueError("GCP_BUCKET_NAME environment variable is not set.")
 
-            self.storage_client = storage.Client(credentials=credentials, client_options=client_options)
+                self.bucket = self.storage_client.bucket(self.gcp_bucket_name)
+            except Exception as e:
+                print(f"Error initializing Google Cloud Storage client: {e}")
+                self.storage_client = None
+                self.bucket = None
+            if self._disabled:
+                # disable() ran while the client was being built on the worker thread
+                self.storage_client = None
+                self.bucket = None
+            return self.bucket is not None
 
-            self.gcp_bucket_name = os.getenv("GCP_BUCKET_NAME")
-            if not self.gcp_bucket_name:
-                raise ValueError("GCP_BUCKET_NAME environment variable is not set.")
+    def disable(self) -> None:
+        """Turn GCS off for the rest of the process, e.g. when the bucket could not be verified."""
+        self._disabled = True
+        self.storage_client = None
+        self.bucket = None
 
-            self.bucket = self.storage_client.bucket(self.gcp_bucket_name)
+    def _ping(self) -> None:
+        # Ping: try to list blobs to test connection
+        _ = list(self.bucket.list_blobs(max_results=1, timeout=GCS_UPLOAD_TIMEOUT_SECONDS))
 
-            # Ping: try to list blobs to test connection
-            _ = list(self.bucket.list_blobs(max_results=1))
+    async def connect(self) -> bool:
+        """Build the client and verify the bucket is reachable. Run once from the app lifespan."""
+        try:
+            if not await _run_blocking("Initializing the GCS client", self._configure):
+                return False
+            await _run_blocking("Connecting to GCS", self._ping)
             print("Google Cloud Storage client initialized and connection verified.")
+            return True
+        except asyncio.CancelledError:
+            # The startup step timed out: an unverified bucket is disabled like an unreachable one
+            print("Google Cloud Storage connection check did not finish in time, uploads are disabled.")
+            self.disable()
+            raise
         except Exception as e:
+            # As before, an unreachable bucket disables uploads instead of failing every request slowly
             print(f"Error initializing Google Cloud Storage client: {e}")
-            self.storage_client = None
-            self.bucket = None
+            self.disable()
+            return False
+
+    def _delete_blob(self, blob_name: str) -> bool:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            # The client-side timeout stops the worker thread as well as the awaiting request
+            self.bucket.blob(blob_name).delete(timeout=GCS_UPLOAD_TIMEOUT_SECONDS)
+            return True
+        except NotFound:
+            return False
+
+    def _blob_name_from_url(self, image_url: str) -> str:
+        # Public URLs are <endpoint>/<bucket>/<quoted blob name>
+        path = unquote(urlparse(image_url).path).lstrip("/")
+        return path.removeprefix(f"{self.gcp_bucket_name}/")
 
     async def delete_image(self, image_url: str):
-        if not self.storage_client or not self.bucket:
+        if not self._configure():
             print("Warning: GCS is not enabled or not properly configured. Skipping image deletion.")
             return
 
         try:
-            parsed_url = urlparse(image_url)
-            blob_name = os.path.basename(parsed_url.path)
+            blob_name = self._blob_name_from_url(image_url)
             if blob_name:
-                blob = self.bucket.blob(blob_name)
-                if blob.exists():
-                    blob.delete()
-                    print(f"Deleted image '{blob_name}' from GCS.")
+                # The variants are not recorded anywhere but their paths follow from the original's
+                variant_names = [variant_blob_name(blob_name, variant) for variant in images.VARIANT_SIZES]
+                deleted = await asyncio.gather(
+                    _run_blocking(f"Deleting '{blob_name}'", self._delete_blob, blob_name),
+                    *(_run_blocking(f"Deleting '{name}'", self._delete_blob, name) for name in variant_names)
+                )
+                if deleted[0]:
+                    print(f"Deleted image '{blob_name}' and {sum(deleted[1:])} variants from GCS.")
                 else:
                     print(f"Blob '{blob_name}' does not exist in GCS.")
             else:
@@ -75,52 +190,234 @@ class GCSBucketManager:
         except Exception as e:
             print(f"Error deleting image from GCS: {e}")
 
-    async def upload_image(
+    async def delete_images(self, image_urls: list[str]):
+        await asyncio.gather(*(self.delete_image(image_url) for image_url in image_urls))
+
+    async def _blob_exists(self, blob: "storage.Blob") -> bool:
+        return await _run_blocking(f"Checking '{blob.name}'", blob.exists, timeout=GCS_UPLOAD_TIMEOUT_SECONDS)
+
+    async def _upload_blob(self, blob: "storage.Blob", data: bytes, content_type: Optional[str]) -> None:
+        # Objects are named after their content, so a URL always serves the same bytes
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        await _run_blocking(
+            f"Uploading '{blob.name}'",
+            blob.upload_from_string,
+            data,
+            content_type=content_type,
+            timeout=GCS_UPLOAD_TIMEOUT_SECONDS
+        )
+
+    async def _upload_variants(self, blob_name: str, data: bytes) -> Optional[ImageVariants]:
+        blobs = {variant: self.bucket.blob(variant_blob_name(blob_name, variant)) for variant in images.VARIANT_SIZES}
+        if all(await asyncio.gather(*(self._blob_exists(blob) for blob in blobs.values()))):
+            return ImageVariants(**{variant: blob.public_url for variant, blob in blobs.items()})
+
+        rendered = await images.render_variants(data)
+        if not rendered:
+            return None
+        await asyncio.gather(*(
+            self._upload_blob(blobs[variant], rendered[variant], images.VARIANT_CONTENT_TYPE)
+            for variant in rendered
+        ))
+        return ImageVariants(**{variant: blobs[variant].public_url for variant in rendered})
+
+    async def _upload_original(self, blob: "storage.Blob", data: bytes, content_type: Optional[str]) -> bool:
+        """Upload unless identical content is already stored; returns whether an object was created."""
+        if await self._blob_exists(blob):
+            return False
+        await self._upload_blob(blob, data, content_type)
+        return True
+
+    async def _store_image(
         self,
         image: UploadFile,
-        image_to_replace: Optional[str]=None,
-        folder: Optional[str]=None
-    ) -> Optional[str]:
-        if not self.storage_client or not self.bucket:
+        image_to_replace: Optional[str],
+        folder: Optional[str],
+        variants: bool
+    ) -> tuple[Optional[str], Optional[ImageVariants], bool]:
+        if not self._configure():
             print("Warning: GCS is not enabled or not properly configured. Skipping image upload.")
-            return None
+            return None, None, False
 
-        # --- Delete old image if it exists ---
-        if image_to_replace:
-            old_blob_name = ""
-            try:
-                parsed_url = urlparse(image_to_replace)
-                old_blob_name = os.path.basename(parsed_url.path)
-                if old_blob_name:
-                    old_blob = self.bucket.blob(old_blob_name)
-                    if old_blob.exists():
-                        old_blob.delete()
-            except Exception as e:
-                print(f"Warning: Could not delete old GCS object '{old_blob_name}': {e}")
+        await image.seek(0)
+        data = await image.read()
 
-        # --- Upload new image ---
+        # --- Upload new image, and its variants alongside ---
         folder = (folder or "").strip("/")
-        unique_filename = f"{'public/' + folder + '/' if folder else ''}{uuid.uuid4()}-{image.filename}"
-        blob = self.bucket.blob(unique_filename)
+        blob_name = f"{'public/' + folder + '/' if folder else ''}{content_blob_name(hashlib.sha256(data).hexdigest(), image.filename)}"
+        blob = self.bucket.blob(blob_name)
 
-        await image.seek(0)
-        blob.upload_from_file(image.file, content_type=image.content_type)
+        if variants:
+            created, image_variants = await asyncio.gather(
+                self._upload_original(blob, data, image.content_type),
+                self._upload_variants(blob_name, data)
+            )
+        else:
+            created, image_variants = await self._upload_original(blob, data, image.content_type), None
+
+        # --- Delete old image once the new one is stored, so a failed upload keeps it ---
+        if image_to_replace and image_to_replace != blob.public_url:
+            await self.delete_image(image_to_replace)
+
+        return blob.public_url, image_variants, created
+
+    async def upload_image_with_variants(
+        self,
+        image: UploadFile,
+        image_to_replace: Optional[str]=None,
+        folder: Optional[str]=None,
+        variants: bool=True
+    ) -> tuple[Optional[str], Optional[ImageVariants]]:
+        """
+        Store the upload as is plus its resized WebP variants, returning the URL of the original
+        and of the variants. The variants are None when the file is not a raster image.
+        Uploading content that is already stored in the folder returns the existing URLs.
+        """
+        url, image_variants, _ = await self._store_image(image, image_to_replace, folder, variants)
+        return url, image_variants
 
-        return blob.public_url
+    async def upload_image(
+        self,
+        image: UploadFile,
+        image_to_replace: Optional[str]=None,
+        folder: Optional[str]=None
+    ) -> Optional[str]:
+        url, _, _ = await self._store_image(image, image_to_replace, folder, variants=False)
+        return url
 
-    async def generate_signed_url(self, blob_name: str, expiration: int = 3600) -> str:
-        if not self.storage_client or not self.bucket:
+    async def upload_images_with_variants(
+        self,
+        files: list[UploadFile],
+        folder: Optional[str]=None
+    ) -> list[tuple[Optional[str], Optional[ImageVariants]]]:
+        """
+        Upload several files concurrently, returning (url, variants) in the order given.
+        If any upload fails the objects this call created are removed again and the first error is raised.
+        """
+        results = await asyncio.gather(
+            *(self._store_image(image, None, folder, variants=True) for image in files),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self.delete_images([result[0] for result in results if isinstance(result, tuple) and result[2]])
+            raise errors[0]
+        return [(url, image_variants) for url, image_variants, _ in results]
+
+    async def generate_signed_url(
+        self,
+        blob_name: str,
+        expiration: int = 3600,
+        method: str = "GET",
+        content_type: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
+        content_md5: Optional[str] = None
+    ) -> str:
+        if not self._configure():
             print("Warning: GCS is not enabled or not properly configured. Skipping signed URL generation.")
             return ""
         try:
             blob = self.bucket.blob(blob_name)
-            url = blob.generate_signed_url(expiration=expiration)
+            # Signing is local (no request), so it does not need the thread pool
+            url = blob.generate_signed_url(
+                version="v4",
+                expiration=timedelta(seconds=expiration),
+                method=method,
+                content_type=content_type,
+                content_md5=content_md5,
+                headers=headers
+            )
             return url
         except Exception as e:
             print(f"Error generating signed URL for blob '{blob_name}': {e}")
             return ""
 
+    def blob_url(self, blob_name: str) -> Optional[str]:
+        if not self._configure():
+            return None
+        return self.bucket.blob(blob_name).public_url
+
+    async def blob_exists(self, blob_name: str) -> bool:
+        if not self._configure():
+            return False
+        return await self._blob_exists(self.bucket.blob(blob_name))
+
+    async def get_blob_info(self, blob_name: str) -> Optional[dict[str, Any]]:
+        """Size, content type and base64 MD5 of a stored object, or None if it does not exist."""
+        if not self._configure():
+            return None
+        from google.api_core.exceptions import NotFound
+
+        blob = self.bucket.blob(blob_name)
+        try:
+            await _run_blocking(f"Reading '{blob_name}'", blob.reload, timeout=GCS_UPLOAD_TIMEOUT_SECONDS)
+        except NotFound:
+            return None
+        return {"size": blob.size, "content_type": blob.content_type, "md5_hash": blob.md5_hash}
+
+    async def create_upload_url(
+        self,
+        blob_name: str,
+        content_type: str,
+        size: int,
+        md5_hash: str
+    ) -> tuple[str, dict[str, str]]:
+        """
+        URL the client PUTs the file to, bypassing the API, and the headers it must send with it.
+        Both kinds only accept exactly `size` bytes whose MD5 is `md5_hash` (base64).
+        """
+        if not self._configure():
+            raise RuntimeError("GCS is not enabled or not properly configured.")
+
+        if self.upload_url_mode == "resumable":
+            blob = self.bucket.blob(blob_name)
+            blob.cache_control = IMMUTABLE_CACHE_CONTROL
+            # An md5Hash in the session metadata makes GCS reject a body with another checksum
+            blob.md5_hash = md5_hash
+            session_url = await _run_blocking(
+                f"Starting upload of '{blob_name}'",
+                blob.create_resumable_upload_session,
+                content_type=content_type,
+                size=size,
+                timeout=GCS_UPLOAD_TIMEOUT_SECONDS
+            )
+            return session_url, {"Content-Type": content_type}
+
+        # Signed headers must be sent verbatim by the client
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "x-goog-content-length-range": f"{size},{size}",
+        }
+        url = await self.generate_signed_url(
+            blob_name,
+            expiration=GCS_UPLOAD_URL_EXPIRATION_SECONDS,
+            method="PUT",
+            content_type=content_type,
+            headers=headers,
+            content_md5=md5_hash
+        )
+        if not url:
+            raise RuntimeError("Could not sign the upload URL.")
+        return url, {"Content-Type": content_type, "Content-MD5": md5_hash, **headers}
+
+    async def generate_variants(self, blob_name: str) -> Optional[ImageVariants]:
+        """Create the resized variants of an object uploaded directly by a client."""
+        if not self._configure():
+            return None
+        blob = self.bucket.blob(blob_name)
+        data = await _run_blocking(f"Downloading '{blob_name}'", blob.download_as_bytes, timeout=GCS_UPLOAD_TIMEOUT_SECONDS)
+        return await self._upload_variants(blob_name, data)
+
 # For backward compatibility, you can instantiate a default manager and expose the function
 _gcs_manager = GCSBucketManager()
 upload_image = _gcs_manager.upload_image
 delete_image = _gcs_manager.delete_image
+upload_image_with_variants = _gcs_manager.upload_image_with_variants
+upload_images_with_variants = _gcs_manager.upload_images_with_variants
+delete_images = _gcs_manager.delete_images
+blob_url = _gcs_manager.blob_url
+blob_exists = _gcs_manager.blob_exists
+get_blob_info = _gcs_manager.get_blob_info
+create_upload_url = _gcs_manager.create_upload_url
+generate_variants = _gcs_manager.generate_variants
+connect = _gcs_manager.connect
@@ -50,7 +50,9 @@ PERMISSION_READ_REVIEW = "read_review"
 PERMISSION_UPDATE_REVIEW = "update_review"
 PERMISSION_DELETE_REVIEW = "delete_review"
 
-ALL_PERMISSIONS = {
+# Bit position of each permission in the token's `perm_mask` claim.
+# Append new permissions at the end: reordering or removing entries changes the meaning of issued tokens.
+PERMISSIONS = (
     PERMISSION_CREATE_USER,
     PERMISSION_READ_USER,
     PERMISSION_UPDATE_USER,
@@ -83,7 +85,11 @@ ALL_PERMISSIONS = {
     PERMISSION_READ_REVIEW,
     PERMISSION_UPDATE_REVIEW,
     PERMISSION_DELETE_REVIEW,
-}
+)
+
+ALL_PERMISSIONS = set(PERMISSIONS)
+
+PERMISSION_BITS = {permission: 1 << bit for bit, permission in enumerate(PERMISSIONS)}
 
 def is_valid_permission(permission) -> bool:
     """Check if the given permission string or list of strings is valid."""
@@ -91,4 +97,18 @@ def is_valid_permission(permission) -> bool:
         return permission in ALL_PERMISSIONS
     if isinstance(permission, list):
         return all(p in ALL_PERMISSIONS for p in permission)
-    return False
\ No newline at end of file
+    return False
+
+def encode_permissions(permissions) -> int:
+    """Pack a collection of permission strings into an integer bitmask. Unknown permissions are ignored."""
+    mask = 0
+    for permission in permissions:
+        mask |= PERMISSION_BITS.get(permission, 0)
+    return mask
+
+def decode_permissions(mask: int) -> set[str]:
+    """Unpack a bitmask produced by encode_permissions."""
+    return {permission for permission, bit in PERMISSION_BITS.items() if mask & bit}
+
+def has_permissions(mask: int, required_mask: int) -> bool:
+    return mask & required_mask == required_mask
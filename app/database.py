@@ -1,16 +1,51 @@
-from pymongo.mongo_client import MongoClient
+from dotenv import load_dotenv
+from pymongo import AsyncMongoClient
 from pymongo.server_api import ServerApi
+from typing import Optional
 import os
 
+from app.pool_metrics import pool_metrics
+
+# Allows CLI entry points (e.g. `python -m app.indexes`) to pick up the .env file
+load_dotenv()
+
 uri = os.getenv("MONGODB_URI").strip().strip('"').strip("'")
 
-client = MongoClient(uri, server_api=ServerApi('1'))
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+# Connection pool settings; unset ones keep the driver defaults (100 connections, no idle limit,
+# no wait timeout, no compression). Compressors are a comma-separated list among zlib, zstd and
+# snappy; zstd and snappy need the zstandard and python-snappy packages.
+MONGO_MAX_POOL_SIZE = _optional_int("MONGO_MAX_POOL_SIZE")
+MONGO_MIN_POOL_SIZE = _optional_int("MONGO_MIN_POOL_SIZE")
+MONGO_MAX_IDLE_TIME_MS = _optional_int("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS") or None
+
+pool_options = {
+    name: value
+    for name, value in {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "compressors": MONGO_COMPRESSORS,
+    }.items()
+    if value is not None
+}
+
+# The async client does not open any connection until the first operation,
+# so importing this module never blocks on the network.
+client = AsyncMongoClient(uri, server_api=ServerApi('1'), event_listeners=[pool_metrics], **pool_options)
 
 db = client.get_database("expotech_db")
 
-# Send a ping to confirm a successful connection
-try:
-    client.admin.command('ping')
-    print("Pinged your deployment. You successfully connected to MongoDB!")
-except Exception as e:
-    print(e)
\ No newline at end of file
+async def ping():
+    # Send a ping to confirm a successful connection
+    try:
+        await client.admin.command('ping')
+        print("Pinged your deployment. You successfully connected to MongoDB!")
+    except Exception as e:
+        print(e)
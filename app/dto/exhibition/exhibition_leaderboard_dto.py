@@ -0,0 +1,38 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+import uuid
+
+class LeaderboardEntryDTO(BaseModel):
+    project_id: str
+    name: Optional[str] = None
+    logo: Optional[str] = None
+    rank: int = Field(..., description="1 for the best score, ties share the same rank")
+    score: float = Field(..., description="Final score: per-role averages combined by role weight")
+    criteria_score: float = Field(..., description="Average criteria-weighted score over all reviews, ignoring roles")
+    review_count: int
+
+    class RoleScore(BaseModel):
+        role_id: Optional[str] = None
+        name: Optional[str] = None
+        weight: float
+        review_count: int
+        score: float = Field(..., description="Average criteria-weighted score given by this role")
+
+    roles: list[RoleScore] = Field(default_factory=list)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "project_id": str(uuid.uuid4()),
+                "name": "NUTRIA",
+                "logo": "logo1.png",
+                "rank": 1,
+                "score": 4.35,
+                "criteria_score": 4.2,
+                "review_count": 12,
+                "roles": [
+                    {"role_id": "default", "name": "guest", "weight": 0.6, "review_count": 10, "score": 4.1},
+                    {"role_id": str(uuid.uuid4()), "name": "professor", "weight": 0.4, "review_count": 2, "score": 4.75}
+                ]
+            }
+        }
@@ -0,0 +1,54 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class MongoPoolSettingsDTO(BaseModel):
+    max_pool_size: int
+    min_pool_size: int
+    max_idle_time_ms: Optional[float] = None
+    wait_queue_timeout_ms: Optional[float] = None
+    compressors: list[str] = Field(default_factory=list)
+
+class MongoPoolMetricsDTO(BaseModel):
+    checked_out: int = Field(..., description="Connections currently in use")
+    waiting: int = Field(..., description="Operations currently waiting for a connection")
+    connections_open: int
+    connections_created: int
+    connections_closed: int
+    checkouts: int
+    checkout_failures: dict[str, int] = Field(default_factory=dict, description="Failed checkouts by reason (e.g. timeout)")
+    wait_avg_ms: float
+    wait_max_ms: float
+    wait_p50_ms: float = Field(..., description="Over the most recent checkouts")
+    wait_p95_ms: float
+    wait_p99_ms: float
+    pool_cleared: int = Field(..., description="Times the pool was cleared after a network error or failover")
+    last_cleared_at: Optional[float] = Field(None, description="Unix time of the last clear")
+    settings: MongoPoolSettingsDTO
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "checked_out": 12,
+                "waiting": 0,
+                "connections_open": 20,
+                "connections_created": 24,
+                "connections_closed": 4,
+                "checkouts": 153204,
+                "checkout_failures": {},
+                "wait_avg_ms": 0.04,
+                "wait_max_ms": 18.2,
+                "wait_p50_ms": 0.02,
+                "wait_p95_ms": 0.09,
+                "wait_p99_ms": 1.3,
+                "pool_cleared": 0,
+                "last_cleared_at": None,
+                "settings": {
+                    "max_pool_size": 100,
+                    "min_pool_size": 0,
+                    "max_idle_time_ms": None,
+                    "wait_queue_timeout_ms": None,
+                    "compressors": []
+                }
+            }
+        }
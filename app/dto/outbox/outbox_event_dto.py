@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, Field
+import uuid
+
+class OutboxEventDTO(BaseModel):
+    id: str = Field(..., alias="_id")
+    kind: str
+    key: str = Field(..., description="Id of the user or role whose copies are propagated, or of the upload intent")
+    status: Literal["pending", "processing", "done", "failed"]
+    attempts: int = 0
+    last_error: Optional[str] = None
+    result: Optional[dict[str, Any]] = Field(None, description="Documents updated per collection")
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "_id": str(uuid.uuid4()),
+                "kind": "user_updated",
+                "key": str(uuid.uuid4()),
+                "status": "done",
+                "attempts": 0,
+                "last_error": None,
+                "result": {"projects": 1, "reviews": 12},
+                "created_at": "2025-10-01T12:00:00Z",
+                "updated_at": "2025-10-01T12:00:01Z"
+            }
+        }
+
+class OutboxStatusDTO(BaseModel):
+    pending: int = 0
+    processing: int = 0
+    done: int = 0
+    failed: int = 0
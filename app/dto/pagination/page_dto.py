@@ -0,0 +1,16 @@
+from typing import Generic, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: list[T] = Field(..., description="Items in this page")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, null on the last page")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [],
+                "next_cursor": "eyJfaWQiOiAiOWExYjJjM2QifQ"
+            }
+        }
@@ -0,0 +1,41 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+import uuid
+
+class ProjectScoreDTO(BaseModel):
+    project_id: str
+    exhibition_id: Optional[str] = None
+    name: Optional[str] = None
+    review_count: int = 0
+    score: float = Field(0, description="Per-role averages combined by role weight")
+    criteria_score: float = Field(0, description="Average criteria-weighted score over all reviews")
+
+    class CriteriaScore(BaseModel):
+        name: str
+        average: float
+        count: int
+
+    criteria: List[CriteriaScore] = Field(default_factory=list)
+
+    class RoleScore(BaseModel):
+        role_id: Optional[str] = None
+        name: Optional[str] = None
+        weight: float
+        review_count: int
+        score: float
+
+    roles: List[RoleScore] = Field(default_factory=list)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "project_id": str(uuid.uuid4()),
+                "exhibition_id": str(uuid.uuid4()),
+                "name": "NUTRIA",
+                "review_count": 3,
+                "score": 4.2,
+                "criteria_score": 4.1,
+                "criteria": [{"name": "Ideia", "average": 4.5, "count": 3}],
+                "roles": [{"role_id": "default", "name": "guest", "weight": 1.0, "review_count": 3, "score": 4.1}]
+            }
+        }
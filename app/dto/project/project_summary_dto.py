@@ -0,0 +1,46 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+import uuid
+from app.model.image import ImageVariants
+
+class ProjectSummaryDTO(BaseModel):
+    id: str = Field(..., alias="_id")
+    name: str
+    company_name: Optional[str] = None
+    description: Optional[str] = None
+    logo: Optional[str] = None
+    images: Optional[List[str]] = Field(default_factory=list)
+    logo_variants: Optional[ImageVariants] = None
+    image_variants: List[Optional[ImageVariants]] = Field(default_factory=list)
+    coordinates: Optional[int] = None
+    exhibition_id: str
+    version: int = 0
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "_id": str(uuid.uuid4()),
+                "name": "Tech Project",
+                "company_name": "Tech Company",
+                "description": "descrição do projeto",
+                "logo": "logo.png",
+                "images": ["img1.png"],
+                "coordinates": 1,
+                "exhibition_id": str(uuid.uuid4())
+            }
+        }
+
+# Project listings skip the embedded expositors and criterias
+PROJECT_SUMMARY_PROJECTION = {
+    "name": 1,
+    "company_name": 1,
+    "description": 1,
+    "logo": 1,
+    "images": 1,
+    "logo_variants": 1,
+    "image_variants": 1,
+    "coordinates": 1,
+    "exhibition_id": 1,
+    "version": 1,
+}
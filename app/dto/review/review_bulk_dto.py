@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+from app.dto.review.review_create_dto import ReviewCreate
+
+MAX_BULK_REVIEWS = 200
+
+class ReviewBulkCreate(BaseModel):
+
+    class ReviewItem(BaseModel):
+        project_id: str
+        grades: List[ReviewCreate.GradeResume]
+        comment: Optional[str] = None
+
+    exhibition_id: str
+    reviews: List[ReviewItem] = Field(min_length=1, max_length=MAX_BULK_REVIEWS)
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "exhibition_id": "1a2b3c4d-5e6f-7a8b-9c0d-1e2f3a4b5c6d",
+                "reviews": [
+                    {
+                        "project_id": "9a1b2c3d-4e5f-6a7b-8c9d-0e1f2a3b4c5d",
+                        "grades": [
+                            {"name": "Ideia", "score": 4.5},
+                            {"name": "Apresentação", "score": 4.0}
+                        ],
+                        "comment": "Excelente projeto!"
+                    }
+                ]
+            }
+        }
+
+class ReviewBulkResultDTO(BaseModel):
+    index: int
+    project_id: str
+    status: Literal["created", "updated", "duplicate", "error"]
+    review_id: Optional[str] = None
+    detail: Optional[str] = None
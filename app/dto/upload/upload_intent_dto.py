@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+import uuid
+
+UploadTarget = Literal["project_logo", "project_image", "user_profile_picture", "exhibition_image"]
+
+class UploadIntentCreate(BaseModel):
+    target: UploadTarget = Field(..., description="Where the file is attached on finalize")
+    target_id: str = Field(..., description="Id of the project, user or exhibition")
+    filename: str = Field(..., description="Original file name, only its extension is kept")
+    content_type: str = Field(..., description="MIME type the file will be uploaded with")
+    size: int = Field(..., gt=0, description="Exact size of the file in bytes")
+    md5: str = Field(
+        ...,
+        pattern="^[A-Za-z0-9+/]{22}==$",
+        description="Base64 MD5 of the file, as sent in Content-MD5. It names the object and the bucket verifies it on upload"
+    )
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "target": "project_logo",
+                "target_id": str(uuid.uuid4()),
+                "filename": "logo.png",
+                "content_type": "image/png",
+                "size": 48213,
+                "md5": "XrY7u+Ae7tCTyyK7j1rNww=="
+            }
+        }
+
+class UploadIntentDTO(BaseModel):
+    id: str = Field(..., alias="_id")
+    target: UploadTarget
+    target_id: str
+    blob_name: str
+    url: Optional[str] = Field(None, description="Public URL of the object once uploaded")
+    content_type: str
+    size: int
+    status: Literal["pending", "finalized"]
+    exists: bool = Field(False, description="The same file is already stored: skip the upload and finalize")
+    upload_url: Optional[str] = Field(None, description="PUT the file here, with upload_headers")
+    upload_headers: dict[str, str] = Field(default_factory=dict)
+    expires_at: datetime
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "_id": str(uuid.uuid4()),
+                "target": "project_logo",
+                "target_id": str(uuid.uuid4()),
+                "blob_name": "public/projects/<project id>/logo/5eb63bbbe01eeed093cb22bb8f5acdc3.png",
+                "url": "https://storage.googleapis.com/bucket/public/projects/<project id>/logo/5eb63bbbe01eeed093cb22bb8f5acdc3.png",
+                "content_type": "image/png",
+                "size": 48213,
+                "status": "pending",
+                "exists": False,
+                "upload_url": "https://storage.googleapis.com/bucket/public/projects/...?X-Goog-Signature=...",
+                "upload_headers": {"Content-Type": "image/png", "Content-MD5": "XrY7u+Ae7tCTyyK7j1rNww=="},
+                "expires_at": "2025-10-01T12:15:00Z"
+            }
+        }
@@ -0,0 +1,20 @@
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+class UserImportResultDTO(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: Literal["created", "duplicate", "error"]
+    user_id: Optional[str] = None
+    detail: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "row": 1,
+                "email": "email@email.com",
+                "status": "duplicate",
+                "user_id": None,
+                "detail": "Email already exists"
+            }
+        }
@@ -0,0 +1,58 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+import uuid
+
+class UserSummaryDTO(BaseModel):
+    id: str = Field(..., alias="_id")
+    email: str
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    profile_picture: Optional[str] = None
+    company: Optional[str] = None
+    class_field: Optional[str] = Field(None, alias="class")
+    verified: bool = True
+
+    class RoleResume(BaseModel):
+        id: Optional[str] = Field(None, alias="_id")
+        name: str
+
+    role: RoleResume
+
+    class ProjectResume(BaseModel):
+        id: str = Field(..., alias="_id")
+        name: str
+
+    project: Optional[ProjectResume] = None
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "_id": str(uuid.uuid4()),
+                "email": "email@email.com",
+                "name": "John Doe",
+                "phone": "(11) 99999-9999",
+                "profile_picture": "https://link-to-image.com/image.png",
+                "company": "PicPay",
+                "class": "A",
+                "verified": True,
+                "role": {"_id": str(uuid.uuid4()), "name": "admin"},
+                "project": {"_id": str(uuid.uuid4()), "name": "Projeto Exemplo"}
+            }
+        }
+
+# Only these fields are read from Mongo for user listings; the password hash,
+# embedded reviews and favorites never leave the database.
+USER_SUMMARY_PROJECTION = {
+    "email": 1,
+    "name": 1,
+    "phone": 1,
+    "profile_picture": 1,
+    "company": 1,
+    "class": 1,
+    "verified": 1,
+    "role._id": 1,
+    "role.name": 1,
+    "project._id": 1,
+    "project.name": 1,
+}
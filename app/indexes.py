@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+from typing import Any, Optional
+
+from pymongo import ASCENDING, TEXT, IndexModel
+
+from app.database import db
+
+# Every index the repositories rely on, per collection. Names are left to the
+# driver defaults (e.g. "email_1") so re-applying the registry against an
+# existing deployment is a no-op instead of an IndexOptionsConflict.
+INDEXES: dict[str, list[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("deactivation_date", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("deactivation_date", ASCENDING), ("role._id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("role._id", ASCENDING), ("deactivation_date", ASCENDING)]),
+        IndexModel(
+            [("project._id", ASCENDING)],
+            partialFilterExpression={"project._id": {"$exists": True}},
+        ),
+        IndexModel([("name", TEXT)], default_language="portuguese"),
+    ],
+    "reviews": [
+        # One review per user and project, so retried or concurrent batches cannot count a review twice.
+        # Named explicitly because it replaces a non-unique index on the same keys (see OBSOLETE_INDEXES).
+        IndexModel(
+            [("user._id", ASCENDING), ("project._id", ASCENDING), ("exhibition._id", ASCENDING)],
+            unique=True,
+            name="review_per_user_project",
+        ),
+        IndexModel([("project._id", ASCENDING)]),
+        IndexModel([("exhibition._id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user.role._id", ASCENDING)]),
+    ],
+    "exhibitions": [
+        IndexModel([("deactivation_date", ASCENDING), ("start_date", ASCENDING), ("end_date", ASCENDING)]),
+        IndexModel([("roles._id", ASCENDING), ("deactivation_date", ASCENDING)]),
+        IndexModel(
+            [("name", TEXT), ("description", TEXT)],
+            weights={"name": 10, "description": 1},
+            default_language="portuguese",
+        ),
+    ],
+    "project_scores": [
+        IndexModel([("exhibition_id", ASCENDING)]),
+    ],
+    "outbox": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)]),
+        IndexModel([("claim", ASCENDING)], sparse=True),
+        # Processed events are kept for a week for the status endpoint (see work_queue.mark_done)
+        IndexModel([("completed_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600),
+    ],
+    "email_queue": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)]),
+        IndexModel([("claim", ASCENDING)], sparse=True),
+        IndexModel([("completed_at", ASCENDING)], expireAfterSeconds=30 * 24 * 3600),
+    ],
+    "upload_intents": [
+        IndexModel([("created_by", ASCENDING), ("_id", ASCENDING)]),
+        # Kept a day past the upload URL expiry so late finalize calls get a clear answer
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=24 * 3600),
+    ],
+    "projects": [
+        IndexModel([("exhibition_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("expositors._id", ASCENDING)]),
+        IndexModel(
+            [("name", TEXT), ("company_name", TEXT), ("description", TEXT)],
+            weights={"name": 10, "company_name": 5, "description": 1},
+            default_language="portuguese",
+        ),
+    ],
+}
+
+# Indexes replaced by a registered one on the same keys, which MongoDB would
+# reject as a conflict. They are dropped before the registry is applied.
+OBSOLETE_INDEXES: dict[str, list[str]] = {
+    "reviews": ["user._id_1_project._id_1_exhibition._id_1"],
+}
+
+# Representative filters for the query paths used by the repositories, checked
+# with `explain` to make sure none of them falls back to a collection scan.
+QUERY_SHAPES: list[tuple[str, dict[str, Any], Optional[dict[str, int]]]] = [
+    ("users", {"email": "shape@example.com"}, None),
+    ("users", {"deactivation_date": None, "role._id": "shape"}, None),
+    ("users", {"role._id": "shape", "deactivation_date": {"$exists": False}}, None),
+    ("users", {"project._id": "shape"}, None),
+    ("reviews", {"user._id": "shape", "project._id": "shape", "exhibition._id": "shape"}, None),
+    ("reviews", {"user._id": "shape"}, None),
+    ("reviews", {"project._id": "shape"}, None),
+    ("reviews", {"exhibition._id": "shape"}, None),
+    ("reviews", {"user.role._id": "shape"}, None),
+    ("exhibitions", {"deactivation_date": None, "start_date": {"$gte": "shape"}}, None),
+    ("exhibitions", {"roles._id": "shape", "deactivation_date": {"$exists": False}}, None),
+    (
+        "exhibitions",
+        {
+            "$or": [
+                {"start_date": {"$lte": "shape"}, "end_date": {"$gte": "shape"}, "deactivation_date": None},
+                {"start_date": {"$gt": "shape"}, "deactivation_date": None},
+            ]
+        },
+        {"start_date": ASCENDING},
+    ),
+    ("projects", {"exhibition_id": "shape"}, None),
+    ("projects", {"expositors._id": "shape"}, None),
+    ("outbox", {"status": "pending", "next_attempt_at": {"$lte": "shape"}}, None),
+    ("outbox", {"claim": "shape"}, None),
+    ("email_queue", {"status": "pending", "next_attempt_at": {"$lte": "shape"}}, None),
+    ("email_queue", {"claim": "shape"}, None),
+    ("projects", {"$text": {"$search": "shape"}}, None),
+    ("users", {"deactivation_date": None, "$text": {"$search": "shape"}}, None),
+    ("exhibitions", {"deactivation_date": None, "$text": {"$search": "shape"}}, None),
+    # Keyset pagination pages (see app/repository/pagination.py)
+    ("users", {"deactivation_date": None, "_id": {"$gt": "shape"}}, {"_id": ASCENDING}),
+    ("reviews", {"exhibition._id": "shape", "_id": {"$gt": "shape"}}, {"_id": ASCENDING}),
+    ("projects", {"exhibition_id": "shape", "_id": {"$gt": "shape"}}, {"_id": ASCENDING}),
+]
+
+
+async def ensure_indexes() -> dict[str, list[str]]:
+    """Create every registered index. Safe to call on every startup."""
+    for name, obsolete in OBSOLETE_INDEXES.items():
+        existing = await db[name].index_information()
+        for index_name in obsolete:
+            if index_name in existing:
+                await db[name].drop_index(index_name)
+
+    collections = list(INDEXES)
+    created = await asyncio.gather(
+        *(db[name].create_indexes(INDEXES[name]) for name in collections)
+    )
+    return dict(zip(collections, created))
+
+
+def _plan_stages(plan: Any) -> list[str]:
+    if isinstance(plan, dict):
+        stages = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+        return stages
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in _plan_stages(item)]
+    return []
+
+
+async def find_collscans() -> list[dict[str, Any]]:
+    """Explain every registered query shape and return the ones planned as COLLSCAN."""
+    collscans = []
+    for collection, query, sort in QUERY_SHAPES:
+        command: dict[str, Any] = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = sort
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        if "COLLSCAN" in _plan_stages(explain["queryPlanner"]["winningPlan"]):
+            collscans.append({"collection": collection, "filter": query, "sort": sort})
+    return collscans
+
+
+async def _run(check: bool) -> int:
+    created = await ensure_indexes()
+    for collection, names in created.items():
+        print(f"{collection}: {', '.join(names)}")
+
+    if not check:
+        return 0
+    collscans = await find_collscans()
+    for shape in collscans:
+        print(f"COLLSCAN on '{shape['collection']}': filter={shape['filter']} sort={shape['sort']}")
+    if not collscans:
+        print("No registered query plans a COLLSCAN.")
+    return 1 if collscans else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the index registry to MongoDB.")
+    parser.add_argument('--check', action='store_true', help='Also explain the registered query shapes and report any COLLSCAN')
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_run(args.check)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 from dotenv import load_dotenv
@@ -20,13 +23,32 @@ from app.routes import (
     class_routes,
     knowledge_routes,
     review_routes,
-    class_routes,
     company_routes,
     exhibition_routes,
-    roles_routes
+    roles_routes,
+    outbox_routes,
+    upload_routes,
+    metrics_routes
 )
+from app import startup
+from app.service import passwords, images, outbox_worker, email_worker
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup.initialize()
+    outbox_task = asyncio.create_task(outbox_worker.run())
+    email_task = asyncio.create_task(email_worker.run())
+    yield
+    outbox_task.cancel()
+    email_task.cancel()
+    # Let in-flight handlers unwind before the Mongo client they use is closed
+    await asyncio.gather(outbox_task, email_task, return_exceptions=True)
+    passwords.shutdown()
+    images.shutdown()
+    await startup.shutdown()
 
 app = FastAPI(
+    lifespan=lifespan,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
@@ -50,6 +72,9 @@ route_modules = [
     class_routes,
     company_routes,
     knowledge_routes,
+    outbox_routes,
+    upload_routes,
+    metrics_routes,
 ]
 
 for module in route_modules:
@@ -1,17 +1,21 @@
 import uuid
 from typing import Optional, List
 from pydantic import BaseModel, Field
+from app.model.image import ImageVariants
 from datetime import datetime
 
 class ExhibitionModel(BaseModel):
     id: Optional[str] = Field(alias="_id")
     name: str = Field(..., description="Exhibition name")
     image: Optional[str] = Field(None, description="Exhibition image")
+    image_variants: Optional[ImageVariants] = Field(None, description="Resized copies of the exhibition image")
     start_date: datetime  = Field(..., description="Exhibition start date")
     end_date: datetime  = Field(..., description="Exhibition end date")
     description: Optional[str] = Field(None, description="Exhibition description")
     deactivation_date: Optional[datetime] = Field(None, description="Exhibition deactivation date")
     banner: Optional[List[str]] = Field(None, description="Projects banners")
+    version: int = Field(0, description="Incremented on every write, used for the ETag")
+    updated_at: Optional[datetime] = Field(None, description="Last write, used for Last-Modified")
 
     class ProjectResume(BaseModel):
         id: Optional[str] = Field(alias="_id")
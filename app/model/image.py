@@ -0,0 +1,17 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class ImageVariants(BaseModel):
+    thumb: Optional[str] = Field(None, description="WebP, longest edge 160px")
+    card: Optional[str] = Field(None, description="WebP, longest edge 480px")
+    full: Optional[str] = Field(None, description="WebP, longest edge 1600px")
+
+    class Config:
+        validate_by_name = True
+        json_schema_extra = {
+            "example": {
+                "thumb": "https://storage.googleapis.com/bucket/public/projects/logo/logo/thumb.webp",
+                "card": "https://storage.googleapis.com/bucket/public/projects/logo/logo/card.webp",
+                "full": "https://storage.googleapis.com/bucket/public/projects/logo/logo/full.webp",
+            }
+        }
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
+from app.model.image import ImageVariants
 
 class ProjectModel(BaseModel):
     id: Optional[str] = Field(None, alias="_id")
@@ -20,7 +21,11 @@ class ProjectModel(BaseModel):
     expositors: list[UserResume] = Field(..., description="List users")
     images: Optional[list[str]] = Field(default_factory=list, description="List images")
     logo: Optional[str] = Field(None, description="Logo")
+    image_variants: list[Optional[ImageVariants]] = Field(default_factory=list, description="Resized copies of each image, in the same order")
+    logo_variants: Optional[ImageVariants] = Field(None, description="Resized copies of the logo")
     deactivation_date: Optional[datetime] = Field(None, description="Exhibition deactivation date")
+    version: int = Field(0, description="Incremented on every write, used for the ETag")
+    updated_at: Optional[datetime] = Field(None, description="Last write, used for Last-Modified")
 
     class CriteriaResume(BaseModel):
         name: str = Field(..., description="Criteria name")
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
+from app.model.image import ImageVariants
 from app.model.role import RoleModel
 
 
@@ -13,6 +14,7 @@ class UserModel(BaseModel):
     name: Optional[str] = Field(None)
     role: RoleModel = Field(...)
     profile_picture: Optional[str] = Field(None, description="Profile picture URL")
+    profile_picture_variants: Optional[ImageVariants] = Field(None, description="Resized copies of the profile picture")
     knowledge: Optional[str] = Field(None, description="How the user got to know about the event")
     age: Optional[int] = Field(None, description="User age")
     company: Optional[str] = Field(None, description="Company name associated with the user")
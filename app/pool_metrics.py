@@ -0,0 +1,116 @@
+import statistics
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Optional
+
+from pymongo import monitoring
+
+# Recent checkout waits kept for the percentiles
+WAIT_SAMPLES = 1024
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Counters fed by the driver's connection pool (CMAP) events. A growing `waiting` count with
+    `checked_out` at the pool size, or long checkout waits, means requests queue for a connection.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checked_out = 0
+            self.waiting = 0
+            self.connections_open = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts = 0
+            self.checkout_failures: dict[str, int] = {}
+            self.wait_total_seconds = 0.0
+            self.wait_max_seconds = 0.0
+            self._waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+            self.clear_count = 0
+            self.last_cleared_at: Optional[float] = None
+
+    def _record_wait(self, duration: float) -> None:
+        self.wait_total_seconds += duration
+        self.wait_max_seconds = max(self.wait_max_seconds, duration)
+        self._waits.append(duration)
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.checkouts += 1
+            self._record_wait(event.duration)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+            self._record_wait(event.duration)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self.connections_created += 1
+            self.connections_open += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self.connections_closed += 1
+            self.connections_open -= 1
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.clear_count += 1
+            self.last_cleared_at = time.time()
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            attempts = self.checkouts + sum(self.checkout_failures.values())
+            if len(waits) >= 2:
+                percentiles = statistics.quantiles(waits, n=100, method="inclusive")
+                p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+            else:
+                p50 = p95 = p99 = waits[0] if waits else 0.0
+            return {
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "connections_open": self.connections_open,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "wait_avg_ms": self.wait_total_seconds / attempts * 1000 if attempts else 0.0,
+                "wait_max_ms": self.wait_max_seconds * 1000,
+                "wait_p50_ms": p50 * 1000,
+                "wait_p95_ms": p95 * 1000,
+                "wait_p99_ms": p99 * 1000,
+                "pool_cleared": self.clear_count,
+                "last_cleared_at": self.last_cleared_at,
+            }
+
+pool_metrics = PoolMetrics()
@@ -0,0 +1,33 @@
+import os
+from typing import Any, Optional
+
+from app.database import db
+from app.repository import work_queue
+
+# Outgoing emails, delivered by app.service.email_worker. Each document keeps its
+# delivery state (status, attempts, last_error, completed_at).
+email_queue_collection = db["email_queue"]
+
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+# Renewed before each message, so it only has to cover sending one email
+EMAIL_LEASE_SECONDS = float(os.getenv("EMAIL_LEASE_SECONDS", "120"))
+
+async def enqueue_email(to: str, subject: str, html: str) -> str:
+    email = work_queue.new_job({"to": to, "subject": subject, "html": html})
+    await email_queue_collection.insert_one(email)
+    return email["_id"]
+
+async def claim_batch(limit: int) -> list[dict[str, Any]]:
+    return await work_queue.claim_batch(email_queue_collection, limit, EMAIL_LEASE_SECONDS)
+
+async def renew_lease(email: dict[str, Any]) -> bool:
+    return await work_queue.renew_lease(email_queue_collection, email, EMAIL_LEASE_SECONDS)
+
+async def mark_sent(email_ids: list[str]) -> None:
+    await work_queue.mark_done(email_queue_collection, email_ids)
+
+async def mark_failed(email: dict[str, Any], error: str) -> None:
+    await work_queue.mark_failed(email_queue_collection, email, error, EMAIL_MAX_ATTEMPTS)
+
+async def get_email(email_id: str) -> Optional[dict[str, Any]]:
+    return await email_queue_collection.find_one({"_id": email_id}, {"html": 0, "claim": 0})
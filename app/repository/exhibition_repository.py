@@ -1,23 +1,92 @@
 from http.client import HTTPException
-from typing import Optional
+import asyncio
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+import os
+import time
 from app.database import db
 from app.dto.exhibition.exhibition_create_dto import ExhibitionCreate
 from app.dto.exhibition.exhibition_update_dto import ExhibitionUpdate
 from app.dto.exhibition.exhibition_resume_dto import ExhibitionResumeDTO
 from app.model.exhibition import ExhibitionModel
+from app.model.image import ImageVariants
 from app.model.role import RoleModel
 from app.repository import project_repository, roles_repository
 import app.constants as c
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pymongo import ASCENDING
-from app.bucket import upload_image
+from app.bucket import upload_image_with_variants, delete_image
+from app.cache import TTLCache
+from app.repository.versioning import bump_version
 from fastapi import UploadFile
 
 exhibition_collection= db["exhibitions"]
 
+EXHIBITION_CACHE_SIZE = int(os.getenv("EXHIBITION_CACHE_SIZE", "64"))
+EXHIBITION_CACHE_TTL_SECONDS = float(os.getenv("EXHIBITION_CACHE_TTL_SECONDS", "60"))
+CURRENT_EXHIBITION_TTL_SECONDS = float(os.getenv("CURRENT_EXHIBITION_TTL_SECONDS", "60"))
 
-def get_all_exhibition(name: Optional[str] = None, start_date: Optional[datetime] = None) -> list[ExhibitionResumeDTO]:
+@dataclass(frozen=True)
+class ExhibitionView:
+    """Read-only, pre-indexed view of an exhibition for review submission."""
+    id: str
+    name: str
+    projects: Mapping[str, ExhibitionModel.ProjectResume]
+    roles: Mapping[str, ExhibitionModel.RoleResume]
+    criteria_weights: Mapping[str, float]
+    criteria_names: frozenset[str]
+
+    @classmethod
+    def from_model(cls, exhibition: ExhibitionModel) -> "ExhibitionView":
+        criteria_weights = {criteria.name: criteria.weight for criteria in exhibition.criteria}
+        return cls(
+            id=exhibition.id,
+            name=exhibition.name,
+            projects=MappingProxyType({project.id: project for project in exhibition.projects}),
+            roles=MappingProxyType({role.id: role for role in exhibition.roles}),
+            criteria_weights=MappingProxyType(criteria_weights),
+            criteria_names=frozenset(criteria_weights),
+        )
+
+# Views are dropped by every write in this module; the TTL only bounds staleness
+# of writes made by another instance.
+_exhibition_views: TTLCache[ExhibitionView] = TTLCache(EXHIBITION_CACHE_SIZE, EXHIBITION_CACHE_TTL_SECONDS)
+
+# Resolved "current exhibition" as (monotonic expiry, exhibition or None), plus the lookup in
+# flight so concurrent misses share a single query. Bumping the generation discards
+# the result of a lookup that started before a write.
+_current_exhibition: Optional[tuple[float, Optional[ExhibitionModel]]] = None
+_current_exhibition_lookup: Optional[asyncio.Task] = None
+_current_exhibition_generation = 0
+
+def invalidate_exhibition_cache(exhibition_id: Optional[str] = None) -> None:
+    global _current_exhibition, _current_exhibition_lookup, _current_exhibition_generation
+    if exhibition_id is None:
+        _exhibition_views.clear()
+    else:
+        _exhibition_views.pop(exhibition_id)
+    _current_exhibition = None
+    _current_exhibition_lookup = None
+    _current_exhibition_generation += 1
+
+async def get_exhibition_view(exhibition_id: str) -> Optional[ExhibitionView]:
+    view = _exhibition_views.get(exhibition_id)
+    if view is None:
+        exhibition = await get_exhibition_by_id(exhibition_id)
+        if exhibition is None:
+            return None
+        view = ExhibitionView.from_model(exhibition)
+        _exhibition_views.set(exhibition_id, view)
+    return view
+
+
+async def get_all_exhibition(
+    name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    search: Optional[str] = None
+) -> list[ExhibitionResumeDTO]:
     query = {"deactivation_date": None}
     
     if name is not None:
@@ -26,36 +95,45 @@ def get_all_exhibition(name: Optional[str] = None, start_date: Optional[datetime
     if start_date is not None:
         query["start_date"] = {"$gte": start_date}
     
-    exhibition_cursor = exhibition_collection.find(query)
-    return [ExhibitionResumeDTO(**exhibition, id=exhibition.get("_id")) for exhibition in exhibition_cursor]
+    if search:
+        query["$text"] = {"$search": search}
+        exhibition_cursor = exhibition_collection.find(query, {"score": {"$meta": "textScore"}}).sort(
+            [("score", {"$meta": "textScore"})]
+        )
+    else:
+        exhibition_cursor = exhibition_collection.find(query)
+    return [ExhibitionResumeDTO(**exhibition, id=exhibition.get("_id")) async for exhibition in exhibition_cursor]
 
-def get_exhibition_by_id(exhibition_id: str) -> Optional[ExhibitionModel]:
-    exhibition_data = exhibition_collection.find_one({"_id": exhibition_id})
+async def get_exhibition_by_id(exhibition_id: str) -> Optional[ExhibitionModel]:
+    exhibition_data = await exhibition_collection.find_one({"_id": exhibition_id})
     if exhibition_data:
         return ExhibitionModel(**exhibition_data)
     return None
 
-def delete_exhibition(exhibition_id: str) -> bool:
-    result = exhibition_collection.update_one(
+async def delete_exhibition(exhibition_id: str) -> bool:
+    result = await exhibition_collection.update_one(
         {"_id": exhibition_id},
-        {"$set": {"deactivation_date": db.client.server_info()['localTime']}}
+        bump_version({"$set": {"deactivation_date": (await db.client.server_info())['localTime']}})
     )
+    invalidate_exhibition_cache(exhibition_id)
     return result.deleted_count > 0
 
 async def create_exhibition(exhibition: ExhibitionCreate, image: UploadFile = None):
     if exhibition.end_date < exhibition.start_date:
         raise ValueError("End date must be greater than start date")
 
-    default_role = roles_repository.get_default_role()
+    default_role = await roles_repository.get_default_role()
 
-    image_url = None
+    exhibition_id = str(uuid.uuid4())
+    image_url, image_variants = None, None
     if image:
-        image_url = await upload_image(image, folder="exhibitions")
+        image_url, image_variants = await upload_image_with_variants(image, folder=f"exhibitions/{exhibition_id}")
 
     exhibition_model = ExhibitionModel(
-        _id = str(uuid.uuid4()),
+        _id = exhibition_id,
         **exhibition.model_dump(),
         image=image_url,
+        image_variants=image_variants,
         projects = [],
         roles = [
             ExhibitionModel.RoleResume(
@@ -70,17 +148,21 @@ async def create_exhibition(exhibition: ExhibitionCreate, image: UploadFile = No
                 weight=1.0
             )
         ],
+        updated_at=datetime.now(timezone.utc),
     )
-    result = exhibition_collection.insert_one(exhibition_model.model_dump(by_alias=True))
+    result = await exhibition_collection.insert_one(exhibition_model.model_dump(by_alias=True))
+    invalidate_exhibition_cache(exhibition_model.id)
     if result.inserted_id:
         return exhibition_model
     return None
 
-def update_exhibion_with_role(role_id: str, updated_role: RoleModel) -> int:
-    result = exhibition_collection.update_many(
-        {"role.id": role_id},
-        {"$set": {"role": updated_role.model_dump(by_alias=True)}}
+async def update_exhibion_with_role(role_id: str, updated_role: RoleModel) -> int:
+    result = await exhibition_collection.update_many(
+        {"roles._id": role_id},
+        # Weights are set per exhibition, only the name comes from the role
+        bump_version({"$set": {"roles.$.name": updated_role.name}})
     )
+    invalidate_exhibition_cache()
     return result.modified_count
 
 async def update_exhibition(exhibition_id: str, update_data: ExhibitionUpdate, image: UploadFile = None) -> Optional[ExhibitionModel]:
@@ -93,71 +175,129 @@ async def update_exhibition(exhibition_id: str, update_data: ExhibitionUpdate, i
     if update_data.end_date and update_data.start_date and update_data.end_date < update_data.start_date:
         raise ValueError("End date must be greater than start date")
 
-    image_url = None
+    image_url, image_variants = None, None
     if image:
-        image_url = await upload_image(image, folder="exhibitions")
+        image_url, image_variants = await upload_image_with_variants(image, folder=f"exhibitions/{exhibition_id}")
 
     update_dict = update_data.model_dump(exclude_unset=True, exclude_none=True, by_alias=True)
     if image_url:
         update_dict["image"] = image_url
+        update_dict["image_variants"] = image_variants.model_dump() if image_variants else None
 
-    result = exhibition_collection.update_one(
+    result = await exhibition_collection.update_one(
         {"_id": exhibition_id},
-        {"$set": update_dict}
+        bump_version({"$set": update_dict})
     )
+    invalidate_exhibition_cache(exhibition_id)
     if result.matched_count:
-        updated = exhibition_collection.find_one({"_id": exhibition_id})
+        updated = await exhibition_collection.find_one({"_id": exhibition_id})
         return ExhibitionModel(**updated)
     return None
 
-def add_project(exhibition_id: str, project: ExhibitionModel.ProjectResume):
-    result = exhibition_collection.update_one(
+async def attach_image(exhibition_id: str, image_url: str) -> Optional[ExhibitionModel]:
+    """Make an object already in the bucket the exhibition image, replacing the previous one."""
+    exhibition = await get_exhibition_by_id(exhibition_id)
+    if not exhibition or exhibition.image == image_url:
+        return exhibition
+
+    await exhibition_collection.update_one(
         {"_id": exhibition_id},
-        {
+        bump_version({"$set": {"image": image_url, "image_variants": None}})
+    )
+    invalidate_exhibition_cache(exhibition_id)
+    if exhibition.image:
+        await delete_image(exhibition.image)
+    return await get_exhibition_by_id(exhibition_id)
+
+async def set_image_variants(exhibition_id: str, image_url: str, variants: Optional[ImageVariants]) -> bool:
+    result = await exhibition_collection.update_one(
+        {"_id": exhibition_id, "image": image_url},
+        bump_version({"$set": {"image_variants": variants.model_dump() if variants else None}})
+    )
+    invalidate_exhibition_cache(exhibition_id)
+    return result.modified_count > 0
+
+async def add_project(exhibition_id: str, project: ExhibitionModel.ProjectResume):
+    result = await exhibition_collection.update_one(
+        {"_id": exhibition_id},
+        bump_version({
             "$addToSet": {
                 **({"banner": project.banners[0]} if project.banners else {}),
                 "projects": project.model_dump(by_alias=True)
             }
-        }
+        })
     )
+    invalidate_exhibition_cache(exhibition_id)
 
     return result.modified_count > 0
 
-def update_project(exhibition_id: str, project_id: str, updated_project: ExhibitionModel.ProjectResume) -> bool:
-    result = exhibition_collection.update_one(
+async def update_project(exhibition_id: str, project_id: str, updated_project: ExhibitionModel.ProjectResume) -> bool:
+    result = await exhibition_collection.update_one(
         {
             "_id": exhibition_id,
             "deactivation_date": {"$exists": False},
             "projects.id": project_id
         },
-        {
+        bump_version({
             "$set": {
                 "projects.$": updated_project.model_dump()
             }
-        }
+        })
     )
+    invalidate_exhibition_cache(exhibition_id)
     return result.modified_count > 0
 
-def remove_project(exhibition_id: str, project_id: str):
-    result = exhibition_collection.update_one(
+async def remove_project(exhibition_id: str, project_id: str):
+    result = await exhibition_collection.update_one(
         {"_id": exhibition_id, "deactivation_date": {"$exists": False}},
-        {"$pull": {"projects": {"id": project_id}}}
+        bump_version({"$pull": {"projects": {"id": project_id}}})
     )
+    invalidate_exhibition_cache(exhibition_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Project not found in any exhibition")
-    result_project = project_repository.delete_project_by_id(project_id)
+    result_project = await project_repository.delete_project_by_id(project_id)
     return result_project
 
-def is_role_in_use(role_id: str) -> bool:
-    exhibition = exhibition_collection.find_one(
+async def is_role_in_use(role_id: str) -> bool:
+    exhibition = await exhibition_collection.find_one(
         {
-            "roles.id": role_id,
+            "roles._id": role_id,
             "deactivation_date": {"$exists": False}
         }
     )
     return exhibition is not None
 
-def get_exhibition_by_current_date() -> Optional[ExhibitionModel]:
+async def get_exhibition_by_current_date() -> Optional[ExhibitionModel]:
+    """
+    Cached lookup of the ongoing (or next) exhibition. The entry expires after
+    CURRENT_EXHIBITION_TTL_SECONDS or at the next UTC midnight, whichever comes first,
+    and concurrent misses wait on the same query. The returned model is shared: do not modify it.
+    """
+    global _current_exhibition_lookup
+    if _current_exhibition is not None and _current_exhibition[0] > time.monotonic():
+        return _current_exhibition[1]
+    if _current_exhibition_lookup is None:
+        _current_exhibition_lookup = asyncio.create_task(_load_current_exhibition(_current_exhibition_generation))
+    lookup = _current_exhibition_lookup
+    try:
+        # Shielded so a cancelled request does not cancel the lookup other requests wait on
+        return await asyncio.shield(lookup)
+    finally:
+        if _current_exhibition_lookup is lookup and lookup.done():
+            _current_exhibition_lookup = None
+
+async def _load_current_exhibition(generation: int) -> Optional[ExhibitionModel]:
+    global _current_exhibition
+    now = datetime.now(timezone.utc)
+    exhibition = await _find_exhibition_by_current_date()
+    if generation == _current_exhibition_generation:
+        # "Current" is resolved per UTC day, so the entry must not outlive the date boundary
+        next_midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        ttl = min(CURRENT_EXHIBITION_TTL_SECONDS, (next_midnight - now).total_seconds())
+        _current_exhibition = (time.monotonic() + ttl, exhibition)
+    return exhibition
+
+async def _find_exhibition_by_current_date() -> Optional[ExhibitionModel]:
     today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
     query = {
         "$or": [
@@ -172,8 +312,7 @@ def get_exhibition_by_current_date() -> Optional[ExhibitionModel]:
             }
         ]
     }
-    exhibition_cursor = exhibition_collection.find(query).sort("start_date", ASCENDING).limit(1)
-    exhibition_data = next(exhibition_cursor, None)
+    exhibition_data = await exhibition_collection.find_one(query, sort=[("start_date", ASCENDING)])
     if exhibition_data:
         return ExhibitionModel(**exhibition_data)
     return None
\ No newline at end of file
@@ -6,32 +6,32 @@ import uuid
 
 knowledge_collection= db["knowledges"]
 
-def get_all_knowledge() -> list[KnowledgeModel]:
+async def get_all_knowledge() -> list[KnowledgeModel]:
     knowledge_cursor = knowledge_collection.find()
-    return [KnowledgeModel (**knowledge) for knowledge in knowledge_cursor]
+    return [KnowledgeModel (**knowledge) async for knowledge in knowledge_cursor]
 
-def get_knowledge_by_id(knowledge_id: str) -> Optional[KnowledgeModel]:
-    knowledge_data = knowledge_collection.find_one({"_id": knowledge_id})
+async def get_knowledge_by_id(knowledge_id: str) -> Optional[KnowledgeModel]:
+    knowledge_data = await knowledge_collection.find_one({"_id": knowledge_id})
     if knowledge_data:
         return KnowledgeModel(**knowledge_data)
     return None
 
-def delete_knowledge(knowledge_id: str) -> bool:
-    result = knowledge_collection.delete_one({"_id": knowledge_id})
+async def delete_knowledge(knowledge_id: str) -> bool:
+    result = await knowledge_collection.delete_one({"_id": knowledge_id})
     return result.deleted_count > 0
 
-def create_knowledge(knowledge_name: str ):
+async def create_knowledge(knowledge_name: str ):
     knowledge_dict = {
         "_id": str(uuid.uuid4()),
         "name": knowledge_name
     }
-    result = knowledge_collection.insert_one(knowledge_dict)
+    result = await knowledge_collection.insert_one(knowledge_dict)
     if result.inserted_id:
         return KnowledgeModel(**knowledge_dict)
     return None
 
-def update_knowledge(knowledge_id:str, update_data: KnowledgeCreateDTO) -> Optional[KnowledgeModel]:
-    result = knowledge_collection.update_one(
+async def update_knowledge(knowledge_id:str, update_data: KnowledgeCreateDTO) -> Optional[KnowledgeModel]:
+    result = await knowledge_collection.update_one(
         {"_id": knowledge_id},
         {"$set": {"name": update_data.name}} 
     )
@@ -0,0 +1,39 @@
+import os
+from typing import Any, Optional
+
+from app.database import db
+from app.repository import work_queue
+
+# Propagation of denormalized copies (user and role resumes embedded in other
+# collections) is recorded here by the write and applied later by
+# app.service.outbox_worker, so the request that made the change does not wait for it.
+outbox_collection = db["outbox"]
+
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+
+KIND_USER_UPDATED = "user_updated"
+KIND_ROLE_UPDATED = "role_updated"
+# Resized variants of a file uploaded straight to the bucket (key: upload intent id)
+KIND_UPLOAD_FINALIZED = "upload_finalized"
+
+async def enqueue(kind: str, key: str) -> str:
+    """Record that the document `key` of the given kind changed and its copies must be refreshed."""
+    event = work_queue.new_job({"kind": kind, "key": key})
+    await outbox_collection.insert_one(event)
+    return event["_id"]
+
+async def claim_batch(limit: int) -> list[dict[str, Any]]:
+    return await work_queue.claim_batch(outbox_collection, limit, OUTBOX_LEASE_SECONDS)
+
+async def mark_done(event_ids: list[str], result: Optional[dict[str, Any]] = None) -> None:
+    await work_queue.mark_done(outbox_collection, event_ids, {"result": result})
+
+async def mark_failed(event: dict[str, Any], error: str) -> None:
+    await work_queue.mark_failed(outbox_collection, event, error, OUTBOX_MAX_ATTEMPTS)
+
+async def get_event(event_id: str) -> Optional[dict[str, Any]]:
+    return await outbox_collection.find_one({"_id": event_id}, {"claim": 0})
+
+async def count_by_status() -> dict[str, int]:
+    return await work_queue.count_by_status(outbox_collection)
@@ -0,0 +1,82 @@
+import base64
+import binascii
+import json
+from typing import Any, Optional
+
+from pymongo import ASCENDING
+from pymongo.asynchronous.collection import AsyncCollection
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(position: dict[str, Any]) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
+
+async def paginate(
+    collection: AsyncCollection,
+    query: dict[str, Any],
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    projection: Optional[dict[str, Any]] = None,
+) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """
+    Keyset pagination ordered by `_id`.
+    Each page is a single index range scan that starts right after the last `_id`
+    of the previous page, so cost does not grow with how deep the client pages.
+    """
+    if cursor:
+        after = decode_cursor(cursor).get("_id")
+        if not isinstance(after, str):
+            raise ValueError("Invalid cursor")
+        query = {"$and": [query, {"_id": {"$gt": after}}]} if query else {"_id": {"$gt": after}}
+
+    # Read one extra document to know whether there is a next page
+    documents = await collection.find(query, projection).sort("_id", ASCENDING).limit(limit + 1).to_list()
+    if len(documents) > limit:
+        documents = documents[:limit]
+        return documents, encode_cursor({"_id": documents[-1]["_id"]})
+    return documents, None
+
+async def paginate_text_search(
+    collection: AsyncCollection,
+    query: dict[str, Any],
+    search: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    projection: Optional[dict[str, Any]] = None,
+) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """
+    Text index search ordered by relevance.
+    Relevance is not a stored field, so there is no key to seek from: the cursor
+    carries an offset instead. Text matches are a small subset of the collection,
+    which keeps the skipped range short.
+    """
+    skip = 0
+    if cursor:
+        skip = decode_cursor(cursor).get("skip")
+        if not isinstance(skip, int) or skip < 0:
+            raise ValueError("Invalid cursor")
+
+    query = {**query, "$text": {"$search": search}}
+    projection = {**(projection or {}), "score": {"$meta": "textScore"}}
+    documents = await (
+        collection.find(query, projection)
+        .sort([("score", {"$meta": "textScore"}), ("_id", ASCENDING)])
+        .skip(skip)
+        .limit(limit + 1)
+        .to_list()
+    )
+    if len(documents) > limit:
+        return documents[:limit], encode_cursor({"skip": skip + limit})
+    return documents, None
@@ -1,33 +1,43 @@
+import asyncio
 import uuid
+from datetime import datetime, timezone
 from typing import Optional, List
 from app.database import db
 from app.dto.project.project_create_dto import ProjectCreateDto
 from app.dto.project.project_update_dto import ProjectUpdateDto
+from app.dto.project.project_summary_dto import ProjectSummaryDTO, PROJECT_SUMMARY_PROJECTION
+from app.dto.pagination.page_dto import Page
 from app.model.exhibition import ExhibitionModel
+from app.model.image import ImageVariants
 from app.model.project import ProjectModel
 from app.model.user import UserModel
-from app.repository import user_repository
+from app.repository import user_repository, project_score_repository
 from app.repository import exhibition_repository
-from app.bucket import upload_image, delete_image
+from app.repository.pagination import DEFAULT_PAGE_SIZE, paginate, paginate_text_search
+from app.repository.versioning import bump_version
+from app.bucket import upload_image_with_variants, upload_images_with_variants, delete_image, delete_images
 from fastapi import HTTPException, UploadFile, status
 
 from app.repository.review_repository import reviews_collection
 
 project_collection = db["projects"]
 
-def get_project_by_id(project_id: str) -> Optional[ProjectModel]:
-    project_data = project_collection.find_one({"_id": project_id})
+async def get_project_by_id(project_id: str) -> Optional[ProjectModel]:
+    project_data = await project_collection.find_one({"_id": project_id})
     if project_data:
         if project_data.get("_id"):
             project_data["_id"] = str(project_data["_id"])
         return ProjectModel(**project_data)
     return None
 
-def get_projects_with_filters(
+async def get_projects_with_filters(
     exhibition_id: Optional[str] = None,
     project_name: Optional[str] = None,
-    company_name: Optional[str] = None
-) -> List[ProjectModel]:
+    company_name: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    search: Optional[str] = None
+) -> Page[ProjectSummaryDTO]:
     query = {}
     
     if exhibition_id:
@@ -39,13 +49,16 @@ def get_projects_with_filters(
     if company_name:
         query["company_name"] = {"$regex": company_name, "$options": "i"}
     
-    projects = project_collection.find(query)
+    if search:
+        projects, next_cursor = await paginate_text_search(project_collection, query, search, limit, cursor, PROJECT_SUMMARY_PROJECTION)
+    else:
+        projects, next_cursor = await paginate(project_collection, query, limit, cursor, PROJECT_SUMMARY_PROJECTION)
     result = []
     for p in projects:
         if p.get("_id"):
             p["_id"] = str(p["_id"])
-        result.append(ProjectModel(**p))
-    return result
+        result.append(ProjectSummaryDTO(**p))
+    return Page[ProjectSummaryDTO](items=result, next_cursor=next_cursor)
 
 
 async def create_project(
@@ -53,7 +66,7 @@ async def create_project(
     logo: UploadFile = None,
     images: List[UploadFile] = None,
 ) -> Optional[ProjectModel]:
-    exhibition = exhibition_repository.get_exhibition_by_id(project_create_dto.exhibition_id)
+    exhibition = await exhibition_repository.get_exhibition_by_id(project_create_dto.exhibition_id)
     if not exhibition:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,7 +75,7 @@ async def create_project(
 
     expositors: List[ProjectModel.UserResume] = []
     for expositor_id in project_create_dto.expositors:
-        expositor = user_repository.get_user_by_id(expositor_id)
+        expositor = await user_repository.get_user_by_id(expositor_id)
         if not expositor:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -70,30 +83,27 @@ async def create_project(
             )
         expositors.append(expositor.model_dump(by_alias=True))
 
-    logo_url: Optional[str] = None
-    if logo:
-        logo_url = await upload_image(logo, folder="projects/logo")
-
-    image_urls: List[str] = []
-    if images:
-        for image in images:
-            url = await upload_image(image, folder="projects/images")
-            image_urls.append(url)
+    project_id = project_create_dto.id or str(uuid.uuid4())
+    (logo_url, logo_variants), uploaded_images = await _upload_project_images(project_id, logo, images)
+    image_urls = [url for url, _ in uploaded_images]
 
     project_data = project_create_dto.model_dump(exclude={"expositors"})
     project = ProjectModel(
-        _id=project_create_dto.id or str(uuid.uuid4()),
+        _id=project_id,
         expositors=expositors,
         logo=logo_url,
         images=image_urls,
+        logo_variants=logo_variants,
+        image_variants=[variants for _, variants in uploaded_images],
+        updated_at=datetime.now(timezone.utc),
         **project_data
     )
 
-    result = project_collection.insert_one(project.model_dump(by_alias=True))
+    result = await project_collection.insert_one(project.model_dump(by_alias=True))
     if not result.inserted_id:
         raise HTTPException(status_code=500, detail="Failed to insert project into database")
 
-    exhibition_repository.add_project(
+    await exhibition_repository.add_project(
         exhibition.id,
         ExhibitionModel.ProjectResume(
             _id=project.id,
@@ -107,7 +117,7 @@ async def create_project(
     )
 
     for expositor in expositors:
-        user_repository.add_project_to_user(
+        await user_repository.add_project_to_user(
             expositor["_id"],
             UserModel.ProjectResume(
                 _id=project.id,
@@ -119,48 +129,63 @@ async def create_project(
 
     return project
 
+async def _upload_project_images(
+    project_id: str,
+    logo: Optional[UploadFile],
+    images: Optional[List[UploadFile]],
+    old_logo: Optional[str] = None
+) -> tuple[tuple[Optional[str], Optional[ImageVariants]], List[tuple[Optional[str], Optional[ImageVariants]]]]:
+    """
+    Upload the logo and the banner images, with their variants, concurrently. Blobs are kept
+    per project so deleting one never breaks another project using the same file.
+    """
+    async def upload_logo() -> tuple[Optional[str], Optional[ImageVariants]]:
+        if not logo:
+            return None, None
+        return await upload_image_with_variants(logo, old_logo, folder=f"projects/{project_id}/logo")
+
+    return await asyncio.gather(
+        upload_logo(),
+        upload_images_with_variants(images or [], folder=f"projects/{project_id}/images")
+    )
+
 async def update_project(project_id: str, project_update_dto: ProjectUpdateDto, logo: UploadFile = None, images: List[UploadFile] = None) -> Optional[ProjectModel]:
-    project = get_project_by_id(project_id)
+    project = await get_project_by_id(project_id)
     if not project:
         ValueError("Project not found")
         return None
 
     expositors: List[ProjectModel.UserResume] = []
     for expositor_id in project_update_dto.expositor_ids:
-        expositor = user_repository.get_user_by_id(expositor_id)
+        expositor = await user_repository.get_user_by_id(expositor_id)
         if not expositor:
             ValueError(f"Expositor {expositor_id} not found")
             return None
         expositors.append(expositor.model_dump(by_alias=True))
 
-    logo_url: Optional[str] = None
-    if logo:
-        url = await upload_image(logo, project.logo, folder="projects/logo")
-        logo_url = url
-
-
-    for image_url in project.images:
-        delete_image(image_url)
-
-    image_urls: List[str] = []
-    if images:
-        for image in images:
-            url = await upload_image(image, folder="projects/images")
-            image_urls.append(url)
+    (logo_url, logo_variants), uploaded_images = await _upload_project_images(project_id, logo, images, old_logo=project.logo)
+    image_urls = [url for url, _ in uploaded_images]
+    # Unchanged images hash to the URLs they already had and stay in place
+    await delete_images([url for url in project.images if url not in image_urls])
 
     project = ProjectModel(
         exhibition_id=project.exhibition_id,
         expositors=expositors,
         logo=logo_url,
         images=image_urls,
+        logo_variants=logo_variants,
+        image_variants=[variants for _, variants in uploaded_images],
         **project_update_dto.model_dump()
     )
 
     project_dict = project.model_dump(by_alias=True)
     project_dict.pop("_id")
-    result = project_collection.update_one({"_id": project_id}, {"$set": project_dict})
+    # Maintained by bump_version
+    project_dict.pop("version")
+    project_dict.pop("updated_at")
+    result = await project_collection.update_one({"_id": project_id}, bump_version({"$set": project_dict}))
     if result.modified_count:
-        exhibition_repository.update_project(project.exhibition_id, project_id, ExhibitionModel.ProjectResume(
+        await exhibition_repository.update_project(project.exhibition_id, project_id, ExhibitionModel.ProjectResume(
             _id=project.id,
             name=project.name,
             logo=logo_url,
@@ -171,7 +196,7 @@ async def update_project(project_id: str, project_update_dto: ProjectUpdateDto,
         ))
 
         for expositor in expositors:
-            user_repository.add_project_to_user(expositor["_id"], UserModel.ProjectResume(
+            await user_repository.add_project_to_user(expositor["_id"], UserModel.ProjectResume(
                 _id=project_id,
                 name=project.name,
                 logo=logo_url,
@@ -181,30 +206,111 @@ async def update_project(project_id: str, project_update_dto: ProjectUpdateDto,
 
     return None
 
-def update_project_with_user(user_id: str, update_user: UserModel) -> int:
-    result = project_collection.update_many(
-        {"user_id": user_id},
-        {"$set": {"user": update_user.model_dump(by_alias=True)}}
+def _exhibition_resume(project: ProjectModel) -> ExhibitionModel.ProjectResume:
+    return ExhibitionModel.ProjectResume(
+        _id=project.id,
+        name=project.name,
+        logo=project.logo,
+        company_name=project.company_name,
+        description=project.description,
+        banners=project.images,
+        coordinates=project.coordinates
+    )
+
+async def attach_logo(project_id: str, logo_url: str) -> Optional[ProjectModel]:
+    """Make an object already in the bucket the project logo, replacing the previous one."""
+    project = await get_project_by_id(project_id)
+    if not project or project.logo == logo_url:
+        return project
+
+    await project_collection.update_one(
+        {"_id": project_id},
+        bump_version({"$set": {"logo": logo_url, "logo_variants": None}})
+    )
+    if project.logo:
+        await delete_image(project.logo)
+    project.logo, project.logo_variants = logo_url, None
+
+    await exhibition_repository.update_project(project.exhibition_id, project_id, _exhibition_resume(project))
+    for expositor in project.expositors:
+        await user_repository.add_project_to_user(expositor.id, UserModel.ProjectResume(
+            _id=project_id,
+            name=project.name,
+            logo=logo_url,
+            company_name=project.company_name,
+        ))
+    return project
+
+async def attach_image(project_id: str, image_url: str) -> Optional[ProjectModel]:
+    """Append an object already in the bucket to the project images."""
+    project = await get_project_by_id(project_id)
+    if not project or image_url in project.images:
+        return project
+
+    await project_collection.update_one(
+        {"_id": project_id},
+        bump_version({"$push": {"images": image_url}})
+    )
+    project.images.append(image_url)
+    await exhibition_repository.update_project(project.exhibition_id, project_id, _exhibition_resume(project))
+    return project
+
+async def set_logo_variants(project_id: str, logo_url: str, variants: Optional[ImageVariants]) -> bool:
+    # Only if the logo was not replaced in the meantime
+    result = await project_collection.update_one(
+        {"_id": project_id, "logo": logo_url},
+        bump_version({"$set": {"logo_variants": variants.model_dump() if variants else None}})
+    )
+    return result.modified_count > 0
+
+async def set_image_variants(project_id: str, image_url: str, variants: Optional[ImageVariants]) -> bool:
+    project_data = await project_collection.find_one({"_id": project_id}, {"images": 1, "image_variants": 1})
+    if not project_data or image_url not in (project_data.get("images") or []):
+        return False
+
+    images = project_data["images"]
+    current_variants = project_data.get("image_variants")
+    # image_variants runs parallel to images but may be shorter (images attached after upload)
+    image_variants = list(current_variants or [])
+    image_variants += [None] * (len(images) - len(image_variants))
+    image_variants[images.index(image_url)] = variants.model_dump() if variants else None
+
+    # Matching both lists makes a concurrent edit of the images fail this update instead of misaligning them
+    result = await project_collection.update_one(
+        {"_id": project_id, "images": images, "image_variants": current_variants},
+        bump_version({"$set": {"image_variants": image_variants}})
+    )
+    return result.modified_count > 0
+
+async def update_project_with_user(user_id: str, update_user: UserModel) -> int:
+    result = await project_collection.update_many(
+        {"expositors._id": user_id},
+        bump_version({"$set": {
+            "expositors.$.name": update_user.name,
+            "expositors.$.profile_picture": update_user.profile_picture,
+            "expositors.$.class": update_user.class_field,
+        }})
     )
     return result.modified_count
 
-def delete_project_by_id(project_id: str) -> bool:
+async def delete_project_by_id(project_id: str) -> bool:
     try:
-        reviews_collection.update_many(
+        await reviews_collection.update_many(
             {"project_id": project_id},
             {"$set": {"active": False}}
         )
         
-        user_repository.unset_project_by_project_id(project_id)
+        await user_repository.unset_project_by_project_id(project_id)
+        await project_score_repository.delete_project_score(project_id)
 
-        project = project_collection.find_one({"_id": project_id})
+        project = await project_collection.find_one({"_id": project_id})
         if project and project.get("exhibition_id"):
             try:
-                exhibition_repository.remove_project(project.get("exhibition_id"), project_id)
+                await exhibition_repository.remove_project(project.get("exhibition_id"), project_id)
             except Exception:
                 pass
 
-        result = project_collection.delete_one({"_id": project_id})
+        result = await project_collection.delete_one({"_id": project_id})
         return result.deleted_count > 0
     except Exception as e:
         return False
\ No newline at end of file
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import hashlib
+from collections import defaultdict
+from typing import Any, Optional
+
+from pymongo import UpdateOne
+
+from app.database import db
+from app.dto.project.project_score_dto import ProjectScoreDTO
+
+# One rollup document per project holding running sums, kept in sync by
+# review_repository on every review write so reading a score is a single lookup.
+project_scores_collection = db["project_scores"]
+
+def _criteria_key(name: str) -> str:
+    # Criteria names are free text and may contain "." or "$", which are not valid in field paths
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
+
+def _review_score(review: dict[str, Any]) -> float:
+    return sum(grade["score"] * grade["weight"] for grade in review.get("grades", []))
+
+def _increments(review: dict[str, Any], sign: int, inc: dict[str, float]) -> None:
+    score = _review_score(review)
+    role_key = review["user"]["role"].get("_id") or "none"
+
+    for path, value in (
+        ("review_count", 1),
+        ("score_sum", score),
+        (f"roles.{role_key}.review_count", 1),
+        (f"roles.{role_key}.score_sum", score),
+    ):
+        inc[path] = inc.get(path, 0) + sign * value
+
+    for grade in review.get("grades", []):
+        key = _criteria_key(grade["name"])
+        inc[f"criteria.{key}.score_sum"] = inc.get(f"criteria.{key}.score_sum", 0) + sign * grade["score"]
+        inc[f"criteria.{key}.count"] = inc.get(f"criteria.{key}.count", 0) + sign
+
+def _labels(review: dict[str, Any]) -> dict[str, Any]:
+    role = review["user"]["role"]
+    role_key = role.get("_id") or "none"
+    labels = {
+        "exhibition_id": review["exhibition"]["_id"],
+        "name": review["project"].get("name"),
+        f"roles.{role_key}.role_id": role.get("_id"),
+        f"roles.{role_key}.name": role.get("name"),
+        f"roles.{role_key}.weight": role.get("weight") or 0,
+    }
+    for grade in review.get("grades", []):
+        labels[f"criteria.{_criteria_key(grade['name'])}.name"] = grade["name"]
+    return labels
+
+def _delta_update(old: Optional[dict[str, Any]], new: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    inc: dict[str, float] = {}
+    if old:
+        _increments(old, -1, inc)
+    if new:
+        _increments(new, 1, inc)
+    inc = {path: value for path, value in inc.items() if value != 0}
+    update: dict[str, Any] = {}
+    if inc:
+        update["$inc"] = inc
+    if new:
+        update["$set"] = _labels(new)
+    return update or None
+
+async def apply_review_change(old: Optional[dict[str, Any]], new: Optional[dict[str, Any]]) -> None:
+    """
+    Apply the difference between the previous and the new version of a review to its project rollup.
+    Pass old=None for an insert and new=None for a delete.
+    """
+    review = new or old
+    if review is None:
+        return
+    project_id = review["project"]["_id"]
+    if old and new and old["project"]["_id"] != project_id:
+        await apply_review_change(old, None)
+        old = None
+    update = _delta_update(old, new)
+    if update:
+        await project_scores_collection.update_one({"_id": project_id}, update, upsert=True)
+
+def review_change_operation(old: Optional[dict[str, Any]], new: Optional[dict[str, Any]]) -> Optional[UpdateOne]:
+    """Same as apply_review_change, as a bulk_write operation. Both versions must belong to the same project."""
+    review = new or old
+    if review is None:
+        return None
+    update = _delta_update(old, new)
+    if update:
+        return UpdateOne({"_id": review["project"]["_id"]}, update, upsert=True)
+    return None
+
+async def apply_review_changes(changes: list[tuple[Optional[dict[str, Any]], Optional[dict[str, Any]]]]) -> None:
+    """Apply several (old, new) review changes to their project rollups with a single bulk_write."""
+    operations = []
+    for old, new in changes:
+        if old and new and old["project"]["_id"] != new["project"]["_id"]:
+            operations.append(review_change_operation(old, None))
+            old = None
+        operations.append(review_change_operation(old, new))
+    operations = [operation for operation in operations if operation is not None]
+    if operations:
+        await project_scores_collection.bulk_write(operations, ordered=False)
+
+def _to_dto(rollup: dict[str, Any]) -> ProjectScoreDTO:
+    review_count = rollup.get("review_count", 0)
+    roles = [
+        ProjectScoreDTO.RoleScore(
+            role_id=role.get("role_id"),
+            name=role.get("name"),
+            weight=role.get("weight", 0),
+            review_count=role["review_count"],
+            score=role["score_sum"] / role["review_count"],
+        )
+        for role in rollup.get("roles", {}).values()
+        if role.get("review_count", 0) > 0
+    ]
+    criteria = [
+        ProjectScoreDTO.CriteriaScore(
+            name=criteria["name"],
+            average=criteria["score_sum"] / criteria["count"],
+            count=criteria["count"],
+        )
+        for criteria in rollup.get("criteria", {}).values()
+        if criteria.get("count", 0) > 0
+    ]
+    criteria_score = rollup.get("score_sum", 0) / review_count if review_count > 0 else 0
+    weight_sum = sum(role.weight for role in roles)
+    score = sum(role.score * role.weight for role in roles) / weight_sum if weight_sum > 0 else criteria_score
+    return ProjectScoreDTO(
+        project_id=rollup["_id"],
+        exhibition_id=rollup.get("exhibition_id"),
+        name=rollup.get("name"),
+        review_count=review_count,
+        score=score,
+        criteria_score=criteria_score,
+        criteria=criteria,
+        roles=roles,
+    )
+
+async def get_project_score(project_id: str) -> Optional[ProjectScoreDTO]:
+    rollup = await project_scores_collection.find_one({"_id": project_id})
+    if rollup:
+        return _to_dto(rollup)
+    return None
+
+async def delete_project_score(project_id: str) -> None:
+    await project_scores_collection.delete_one({"_id": project_id})
+
+async def rebuild_project_scores(exhibition_id: Optional[str] = None) -> int:
+    """Recompute every rollup (or those of one exhibition) from the reviews collection."""
+    query = {"exhibition._id": exhibition_id} if exhibition_id else {}
+    increments: dict[str, dict[str, float]] = defaultdict(dict)
+    labels: dict[str, dict[str, Any]] = defaultdict(dict)
+    async for review in db["reviews"].find(query).batch_size(500):
+        project_id = review["project"]["_id"]
+        _increments(review, 1, increments[project_id])
+        labels[project_id].update(_labels(review))
+
+    await project_scores_collection.delete_many({"exhibition_id": exhibition_id} if exhibition_id else {})
+    operations = [
+        UpdateOne({"_id": project_id}, {"$set": {**labels[project_id], **inc}}, upsert=True)
+        for project_id, inc in increments.items()
+    ]
+    if operations:
+        await project_scores_collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the per-project score rollups from the reviews collection.")
+    parser.add_argument('--exhibition-id', type=str, default=None, help='Only rebuild the projects of this exhibition (default: all)')
+    args = parser.parse_args()
+    rebuilt = asyncio.run(rebuild_project_scores(args.exhibition_id))
+    print(f"Rebuilt {rebuilt} project score rollups")
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,18 @@
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
+from pydantic import ValidationError
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from app.database import db
 from app.model.review import ReviewModel
 from app.model.user import UserModel
+from app.model.exhibition import ExhibitionModel
 from app.dto.review.review_create_dto import ReviewCreate
 from app.dto.review.review_update_dto import ReviewUpdate
-from app.repository import exhibition_repository, user_repository, exhibition_repository
+from app.dto.review.review_bulk_dto import ReviewBulkCreate, ReviewBulkResultDTO
+from app.dto.pagination.page_dto import Page
+from app.dto.exhibition.exhibition_leaderboard_dto import LeaderboardEntryDTO
+from app.repository import exhibition_repository, user_repository, project_score_repository
+from app.repository.pagination import DEFAULT_PAGE_SIZE, paginate
 
 import uuid
 from app.model.role import RoleModel
@@ -15,43 +23,27 @@ from app.constants import DEFAULT_ROLE_ID
 
 reviews_collection = db["reviews"]    
 
-def get_all_reviews() -> list[ReviewModel]:
-    reviews_cursor = reviews_collection.find()
-    return [ReviewModel(**review) for review in reviews_cursor]
+async def get_all_reviews(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Page[ReviewModel]:
+    reviews, next_cursor = await paginate(reviews_collection, {}, limit, cursor)
+    return Page[ReviewModel](items=[ReviewModel(**review) for review in reviews], next_cursor=next_cursor)
 
-def create_review(dto: ReviewCreate, current_user: User) -> Optional[ReviewModel]:
-    exhibition = exhibition_repository.get_exhibition_by_id(dto.exhibition_id)
-    if exhibition is None:
-        raise ValueError("Exhibition not found")
-    project = next((p for p in exhibition.projects if p.id == dto.project_id), None)
-    if project is None:
-        raise ValueError("Project not found")
-
-    criteria_weight_map = {c.name: c.weight for c in exhibition.criteria}
-    exhibition_criteria_names = set(criteria_weight_map.keys())
-    review_grade_names = set([g.name for g in dto.grades])
-    if exhibition_criteria_names != review_grade_names:
-        raise ValueError("Grades do not match exhibition criteria")
-
-    exhibition_role = next((r for r in exhibition.roles if r.id == current_user.role.id), None)
-    if exhibition_role is None:
-        exhibition_role = next(r for r in exhibition.roles if r.id == DEFAULT_ROLE_ID)
-
-    # Upsert logic: check for existing review
-    existing_review = reviews_collection.find_one({
-        "user._id": current_user.id,
-        "project._id": project.id,
-        "exhibition._id": exhibition.id
-    })
-
-    review_model = ReviewModel(
-        _id=str(existing_review["_id"]) if existing_review else str(uuid.uuid4()),
+def _build_review_model(
+    review_id: str,
+    grades: list,
+    comment: Optional[str],
+    exhibition: "exhibition_repository.ExhibitionView",
+    project: ExhibitionModel.ProjectResume,
+    exhibition_role: ExhibitionModel.RoleResume,
+    current_user: User
+) -> ReviewModel:
+    return ReviewModel(
+        _id=review_id,
         grades=[
             ReviewModel.Grade(
                 name=grade.name,
                 score=grade.score,
-                weight=criteria_weight_map[grade.name]
-            ) for grade in dto.grades
+                weight=exhibition.criteria_weights[grade.name]
+            ) for grade in grades
         ],
         project=ReviewModel.ProjectResume(
             _id=project.id,
@@ -72,50 +64,197 @@ def create_review(dto: ReviewCreate, current_user: User) -> Optional[ReviewModel
                 weight=exhibition_role.weight
             )
         ),
-        comment=dto.comment
+        comment=comment
+    )
+
+def _review_criteria(review_model: ReviewModel) -> list[dict]:
+    return [
+        {"name": grade.name, "score": grade.score}
+        for grade in review_model.grades
+    ]
+
+def _exhibition_role(exhibition: "exhibition_repository.ExhibitionView", current_user: User) -> ExhibitionModel.RoleResume:
+    exhibition_role = exhibition.roles.get(current_user.role.id)
+    if exhibition_role is None:
+        exhibition_role = exhibition.roles[DEFAULT_ROLE_ID]
+    return exhibition_role
+
+async def create_review(dto: ReviewCreate, current_user: User) -> Optional[ReviewModel]:
+    exhibition = await exhibition_repository.get_exhibition_view(dto.exhibition_id)
+    if exhibition is None:
+        raise ValueError("Exhibition not found")
+    project = exhibition.projects.get(dto.project_id)
+    if project is None:
+        raise ValueError("Project not found")
+
+    review_grade_names = set([g.name for g in dto.grades])
+    if exhibition.criteria_names != review_grade_names:
+        raise ValueError("Grades do not match exhibition criteria")
+
+    exhibition_role = _exhibition_role(exhibition, current_user)
+
+    # Upsert logic: check for existing review
+    existing_review = await reviews_collection.find_one({
+        "user._id": current_user.id,
+        "project._id": project.id,
+        "exhibition._id": exhibition.id
+    })
+
+    review_model = _build_review_model(
+        str(existing_review["_id"]) if existing_review else str(uuid.uuid4()),
+        dto.grades,
+        dto.comment,
+        exhibition,
+        project,
+        exhibition_role,
+        current_user
     )
 
     if existing_review:
         # Update the existing review
-        result = reviews_collection.update_one(
+        review_dict = review_model.model_dump(by_alias=True)
+        result = await reviews_collection.update_one(
             {"_id": existing_review["_id"]},
-            {"$set": review_model.model_dump(by_alias=True)}
+            {"$set": review_dict}
         )
         if result.modified_count > 0:
-            criteria = [
-                {"name": grade.name, "score": grade.score}
-                for grade in review_model.grades
-            ]
-            user_repository.add_review_to_user(
+            await project_score_repository.apply_review_change(existing_review, review_dict)
+            await user_repository.add_review_to_user(
                 review_model.user.id,
                 review_model.id,
                 review_model.project.id,
                 review_model.exhibition.id,
                 review_model.comment,
-                criteria
+                _review_criteria(review_model)
             )
             return review_model
         return None
     else:
         # Create a new review
-        result = reviews_collection.insert_one(review_model.model_dump(by_alias=True))
+        review_dict = review_model.model_dump(by_alias=True)
+        try:
+            result = await reviews_collection.insert_one(review_dict)
+        except DuplicateKeyError:
+            raise ValueError("Review already exists")
         if result.inserted_id:
-            criteria = [
-                {"name": grade.name, "score": grade.score}
-                for grade in review_model.grades
-            ]
-            user_repository.add_review_to_user(
+            await project_score_repository.apply_review_change(None, review_dict)
+            await user_repository.add_review_to_user(
                 review_model.user.id,
                 review_model.id,
                 review_model.project.id,
                 review_model.exhibition.id,
                 review_model.comment,
-                criteria
+                _review_criteria(review_model)
             )
             return review_model
         return None
 
-def update_review(review_id: str, update_data: ReviewUpdate) -> Optional[ReviewModel]:
+async def create_reviews_bulk(dto: ReviewBulkCreate, current_user: User) -> list[ReviewBulkResultDTO]:
+    """
+    Validate and upsert a batch of reviews of the same exhibition.
+    The exhibition and the user's existing reviews are read once for the whole batch and
+    reviews, the user's review summaries and the score rollups are each written with a single bulk_write.
+    Items that fail validation or writing are reported individually without failing the batch;
+    a review another request inserted in the meantime is reported as a duplicate.
+    """
+    exhibition = await exhibition_repository.get_exhibition_view(dto.exhibition_id)
+    if exhibition is None:
+        raise ValueError("Exhibition not found")
+
+    exhibition_role = _exhibition_role(exhibition, current_user)
+
+    existing_reviews = {
+        review["project"]["_id"]: review
+        async for review in reviews_collection.find({
+            "user._id": current_user.id,
+            "exhibition._id": exhibition.id,
+            "project._id": {"$in": list({item.project_id for item in dto.reviews})}
+        })
+    }
+
+    results: list[ReviewBulkResultDTO] = []
+    pending: list[tuple[ReviewBulkResultDTO, Optional[dict], dict]] = []
+    operations = []
+    seen_projects = set()
+    for index, item in enumerate(dto.reviews):
+        result = ReviewBulkResultDTO(index=index, project_id=item.project_id, status="error")
+        results.append(result)
+
+        project = exhibition.projects.get(item.project_id)
+        if project is None:
+            result.detail = "Project not found"
+            continue
+        if item.project_id in seen_projects:
+            result.status = "duplicate"
+            result.detail = "Duplicate project in batch"
+            continue
+        if set(g.name for g in item.grades) != exhibition.criteria_names:
+            result.detail = "Grades do not match exhibition criteria"
+            continue
+
+        existing_review = existing_reviews.get(item.project_id)
+        try:
+            review_model = _build_review_model(
+                str(existing_review["_id"]) if existing_review else str(uuid.uuid4()),
+                item.grades,
+                item.comment,
+                exhibition,
+                project,
+                exhibition_role,
+                current_user
+            )
+        except ValidationError as e:
+            result.detail = str(e)
+            continue
+        review_dict = review_model.model_dump(by_alias=True)
+        if existing_review:
+            operations.append(UpdateOne({"_id": existing_review["_id"]}, {"$set": review_dict}))
+        else:
+            operations.append(InsertOne(review_dict))
+        result.review_id = review_model.id
+        seen_projects.add(item.project_id)
+        pending.append((result, existing_review, review_dict))
+
+    if not operations:
+        return results
+
+    failed = {}
+    try:
+        await reviews_collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+
+    written = []
+    for operation_index, (result, existing_review, review_dict) in enumerate(pending):
+        error = failed.get(operation_index)
+        if error is not None:
+            # A concurrent or retried batch inserted this review after it was read above
+            if error.get("code") == 11000:
+                result.status = "duplicate"
+                result.detail = "Review already exists"
+            else:
+                result.detail = error.get("errmsg", "Write failed")
+            result.review_id = None
+            continue
+        result.status = "updated" if existing_review else "created"
+        written.append((existing_review, review_dict))
+
+    if written:
+        review_ids = [review_dict["_id"] for _, review_dict in written]
+        await user_repository.replace_user_reviews(current_user.id, review_ids, [
+            {
+                "_id": review_dict["_id"],
+                "project_id": review_dict["project"]["_id"],
+                "exhibition_id": review_dict["exhibition"]["_id"],
+                "comment": review_dict["comment"],
+                "criteria": [{"name": g["name"], "score": g["score"]} for g in review_dict["grades"]]
+            }
+            for _, review_dict in written
+        ])
+        await project_score_repository.apply_review_changes(written)
+    return results
+
+async def update_review(review_id: str, update_data: ReviewUpdate) -> Optional[ReviewModel]:
     update_fields = {}
 
     if update_data.grades is not None:
@@ -125,65 +264,150 @@ def update_review(review_id: str, update_data: ReviewUpdate) -> Optional[ReviewM
     if not update_fields:
         return None 
     
-    result = reviews_collection.update_one(
+    # Returns the document as it was before the update, needed for the score rollup delta
+    previous_review = await reviews_collection.find_one_and_update(
         {"_id": review_id},
         {"$set": update_fields}
     )
 
-    if result.modified_count > 0:
-        updated_review = reviews_collection.find_one({"_id": update_data.id})
-        if updated_review:
-            return ReviewModel(**updated_review)
+    if previous_review:
+        updated_review = {**previous_review, **update_fields}
+        await project_score_repository.apply_review_change(previous_review, updated_review)
+        return ReviewModel(**updated_review)
     return None
 
-def get_review_by_id(review_id: str) -> Optional[ReviewModel]:
-    review_data = reviews_collection.find_one({"_id": review_id})
+async def get_review_by_id(review_id: str) -> Optional[ReviewModel]:
+    review_data = await reviews_collection.find_one({"_id": review_id})
     if review_data:
         return ReviewModel(**review_data)
     return None
 
-def delete_review(review_id: str) -> Optional[ReviewModel]:
-    review = reviews_collection.find_one({"_id": review_id})
+async def delete_review(review_id: str) -> Optional[ReviewModel]:
+    review = await reviews_collection.find_one({"_id": review_id})
     if not review:
         raise ValueError("Review not found")
-    result = reviews_collection.delete_one({"_id": review_id})
+    result = await reviews_collection.delete_one({"_id": review_id})
     if result.deleted_count == 0:
         raise Exception("Error deleting review")
+    await project_score_repository.apply_review_change(review, None)
     return ReviewModel(**review)
 
-def is_role_in_use(role_id: str) -> bool:
-    review = reviews_collection.find_one(
-        {"user.role.id": role_id}
+async def is_role_in_use(role_id: str) -> bool:
+    review = await reviews_collection.find_one(
+        {"user.role._id": role_id}
     )
     return review is not None
 
-def get_reviews_by_exhibition(
+async def get_reviews_by_exhibition(
     exhibition_id: str,
     entire_project: bool = False,
-    entire_user: bool = False
-) -> list[ReviewModel]:
-    pipeline = [{"$match": {"exhibition._id": exhibition_id}}]
-
-    reviews_cursor = reviews_collection.aggregate(pipeline)
-    reviews_raw = list(reviews_cursor)
+    entire_user: bool = False,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> Page[ReviewModel]:
+    reviews, next_cursor = await paginate(reviews_collection, {"exhibition._id": exhibition_id}, limit, cursor)
+    return Page[ReviewModel](items=[ReviewModel(**review) for review in reviews], next_cursor=next_cursor)
 
-    return [ReviewModel(**review) for review in reviews_raw]
+async def iter_reviews(
+    exhibition_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    batch_size: int = 500
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Yield raw review documents straight from the cursor, one batch in memory at a time.
+    """
+    query = {}
+    if exhibition_id:
+        query["exhibition._id"] = exhibition_id
+    if project_id:
+        query["project._id"] = project_id
+    async for review in reviews_collection.find(query).sort("_id", 1).batch_size(batch_size):
+        yield review
 
-def get_reviews_by_project(project_id: str) -> list[ReviewModel]:
+async def get_reviews_by_project(project_id: str) -> list[ReviewModel]:
     reviews_cursor = reviews_collection.find({"project._id": project_id})
 
-    return [ReviewModel(**review) for review in reviews_cursor]
+    return [ReviewModel(**review) async for review in reviews_cursor]
+
+async def get_exhibition_leaderboard(exhibition_id: str) -> list[LeaderboardEntryDTO]:
+    """
+    Rank the projects of an exhibition in a single aggregation over its reviews.
+    A review scores sum(score * criteria weight). Scores are averaged per role and
+    the role averages are combined by role weight, so a role with many reviewers
+    does not outweigh a role with few.
+    """
+    pipeline = [
+        {"$match": {"exhibition._id": exhibition_id}},
+        {"$project": {
+            "project": 1,
+            "role": "$user.role",
+            "score": {
+                "$reduce": {
+                    "input": {"$ifNull": ["$grades", []]},
+                    "initialValue": 0,
+                    "in": {"$add": ["$$value", {"$multiply": ["$$this.score", "$$this.weight"]}]}
+                }
+            }
+        }},
+        {"$group": {
+            "_id": {"project": "$project._id", "role": "$role._id"},
+            "name": {"$first": "$project.name"},
+            "logo": {"$first": "$project.logo"},
+            "role_name": {"$first": "$role.name"},
+            "role_weight": {"$avg": {"$ifNull": ["$role.weight", 0]}},
+            "review_count": {"$sum": 1},
+            "score_sum": {"$sum": "$score"}
+        }},
+        {"$addFields": {"role_score": {"$divide": ["$score_sum", "$review_count"]}}},
+        {"$group": {
+            "_id": "$_id.project",
+            "name": {"$first": "$name"},
+            "logo": {"$first": "$logo"},
+            "review_count": {"$sum": "$review_count"},
+            "score_sum": {"$sum": "$score_sum"},
+            "weighted_sum": {"$sum": {"$multiply": ["$role_score", "$role_weight"]}},
+            "role_weight_sum": {"$sum": "$role_weight"},
+            "roles": {"$push": {
+                "role_id": "$_id.role",
+                "name": "$role_name",
+                "weight": "$role_weight",
+                "review_count": "$review_count",
+                "score": "$role_score"
+            }}
+        }},
+        {"$addFields": {"criteria_score": {"$divide": ["$score_sum", "$review_count"]}}},
+        {"$addFields": {"score": {"$cond": [
+            {"$gt": ["$role_weight_sum", 0]},
+            {"$divide": ["$weighted_sum", "$role_weight_sum"]},
+            "$criteria_score"
+        ]}}},
+        {"$setWindowFields": {"sortBy": {"score": -1}, "output": {"rank": {"$rank": {}}}}},
+        {"$sort": {"rank": 1, "_id": 1}},
+    ]
+    cursor = await reviews_collection.aggregate(pipeline)
+    return [
+        LeaderboardEntryDTO(project_id=entry["_id"], **entry)
+        async for entry in cursor
+    ]
 
-def update_reviews_with_role(role_id: str, updated_role: RoleModel) -> int:
-    result = reviews_collection.update_many(
-        {"role.id": role_id},
-        {"$set": {"role": updated_role.model_dump(by_alias=True)}}
+async def update_reviews_with_role(role_id: str, updated_role: RoleModel) -> int:
+    result = await reviews_collection.update_many(
+        {"user.role._id": role_id},
+        # The weight is the exhibition's, copied when the review was created
+        {"$set": {"user.role.name": updated_role.name}}
     )
     return result.modified_count
 
-def update_reviews_with_user(user_id: str, update_user: UserModel) -> int:
-    result = reviews_collection.update_many(
+async def update_reviews_with_user(user_id: str, update_user: UserModel) -> int:
+    result = await reviews_collection.update_many(
         {"user._id": user_id},
-        {"$set": {"user": update_user.model_dump(by_alias=True)}}
+        # Only the resume fields, the role stays the exhibition's one used for scoring
+        {"$set": {
+            "user.name": update_user.name or update_user.email,
+            "user.class": update_user.class_field,
+            "user.knowledge": update_user.knowledge,
+            "user.age": update_user.age,
+            "user.company": update_user.company,
+        }}
     )
     return result.modified_count
\ No newline at end of file
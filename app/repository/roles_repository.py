@@ -1,37 +1,79 @@
+import asyncio
+import os
+import time
 from typing import Optional
 from app.database import db
 from app.dto.role.role_upsert_dto import RoleUpsert
 from app.model.role import RoleModel
 import uuid
 import app.constants as c
-from app.repository import user_repository, exhibition_repository, review_repository
+from app.repository import user_repository, exhibition_repository, review_repository, outbox_repository
 
 
 roles_collection = db["roles"]
 
-def get_role_by_id(role_id: str, requesting_role_permissions: Optional[list[str]] = None) -> Optional[RoleModel]:
-    role_data = roles_collection.find_one({"_id": role_id})
-    if not role_data:
+# Roles are few and rarely change, so all of them are kept in memory keyed by id.
+# Writes through this module invalidate the cache; the TTL bounds how long another
+# instance (e.g. the other side of a blue/green deploy) can serve a stale role.
+ROLE_CACHE_TTL_SECONDS = float(os.getenv("ROLE_CACHE_TTL_SECONDS", "60"))
+
+# Bumping the generation discards a reload that started before the invalidation.
+_roles_cache: Optional[dict[str, RoleModel]] = None
+_roles_loaded_at = 0.0
+_roles_generation = 0
+_roles_lock = asyncio.Lock()
+
+def invalidate_role_cache() -> None:
+    global _roles_cache, _roles_generation
+    _roles_cache = None
+    _roles_generation += 1
+
+async def _cached_roles() -> dict[str, RoleModel]:
+    global _roles_cache, _roles_loaded_at
+    if _roles_cache is not None and time.monotonic() - _roles_loaded_at < ROLE_CACHE_TTL_SECONDS:
+        return _roles_cache
+    async with _roles_lock:
+        # Another request may have reloaded the roles while this one waited
+        if _roles_cache is None or time.monotonic() - _roles_loaded_at >= ROLE_CACHE_TTL_SECONDS:
+            generation = _roles_generation
+            roles = {role["_id"]: RoleModel(**role) async for role in roles_collection.find()}
+            if generation != _roles_generation:
+                # Invalidated mid-reload: serve this result once, but do not cache it
+                return roles
+            _roles_cache, _roles_loaded_at = roles, time.monotonic()
+        return _roles_cache
+
+async def _find_role(role_id: str) -> Optional[RoleModel]:
+    roles = await _cached_roles()
+    role = roles.get(role_id)
+    if role is None:
+        # Not loaded yet, e.g. created by another instance since the last reload
+        role_data = await roles_collection.find_one({"_id": role_id})
+        if not role_data:
+            return None
+        role = roles[role_id] = RoleModel(**role_data)
+    # Callers embed the role in users and may modify it, so never hand out the cached instance
+    return role.model_copy(deep=True)
+
+async def get_role_by_id(role_id: str, requesting_role_permissions: Optional[list[str]] = None) -> Optional[RoleModel]:
+    role = await _find_role(role_id)
+    if role is None:
         return None
 
     if requesting_role_permissions is not None:
-        role_permissions = role_data.get("permissions", [])
-        for perm in role_permissions:
+        for perm in role.permissions:
             if perm not in requesting_role_permissions:
                 raise PermissionError(f"Insufficient permissions to access role {role_id}")
-    return RoleModel(**role_data)
+    return role
 
-def get_default_role() -> Optional[RoleModel]:
-    role_data = roles_collection.find_one({"_id": c.DEFAULT_ROLE_ID})
-    if role_data:
-        return RoleModel(**role_data)
-    return None
+async def get_default_role() -> Optional[RoleModel]:
+    return await _find_role(c.DEFAULT_ROLE_ID)
 
-def list_all_roles() -> list[RoleModel]:
-    roles_cursor = roles_collection.find()
-    return [RoleModel(**role) for role in roles_cursor]
+async def list_all_roles() -> list[RoleModel]:
+    roles = await _cached_roles()
+    return [role.model_copy(deep=True) for role in roles.values()]
 
-def create_role (role: RoleUpsert) -> Optional[RoleModel]:
+async def create_role (role: RoleUpsert) -> Optional[RoleModel]:
     if role.permissions is not None and len(role.permissions) > 0 and not c.is_valid_permission(role.permissions):
         raise ValueError("One or more permissions are invalid")
 
@@ -41,36 +83,38 @@ def create_role (role: RoleUpsert) -> Optional[RoleModel]:
         permissions=role.permissions or default_permissions(),
     )
 
-    result = roles_collection.insert_one(role_model.model_dump(by_alias=True))
+    result = await roles_collection.insert_one(role_model.model_dump(by_alias=True))
+    invalidate_role_cache()
 
     if result.inserted_id:
         return role_model
     return None
 
 
-def update_role(role_id: str, update_data: RoleModel) -> Optional[RoleModel]:
-    role_data = roles_collection.find_one({"id": role_id})
+async def update_role(role_id: str, update_data: RoleModel) -> Optional[RoleModel]:
+    role_data = await roles_collection.find_one({"id": role_id})
     if role_data:
         updated_role = {**role_data, **update_data.model_dump(exclude_unset=True)}
         
-        roles_collection.replace_one({"id": role_id}, updated_role)
-        users_updated = user_repository.update_users_with_role(role_id, updated_role)
-        exhibitions_updated = exhibition_repository.update_exhibion_with_role(role_id, updated_role)
-        reviews_updated = review_repository.update_reviews_with_role(role_id, updated_role)
+        await roles_collection.replace_one({"id": role_id}, updated_role)
+        invalidate_role_cache()
+        # Copies in users, exhibitions and reviews are refreshed by the outbox worker
+        await outbox_repository.enqueue(outbox_repository.KIND_ROLE_UPDATED, role_id)
 
         return RoleModel(**updated_role)
     return None
 
-def delete_role(role_id: str) -> bool:
+async def delete_role(role_id: str) -> bool:
     
-    if user_repository.is_role_in_use(role_id):
+    if await user_repository.is_role_in_use(role_id):
         return False
-    if exhibition_repository.is_role_in_use(role_id):
+    if await exhibition_repository.is_role_in_use(role_id):
         return False
-    if review_repository.is_role_in_use(role_id):
+    if await review_repository.is_role_in_use(role_id):
         return False
 
-    result = roles_collection.delete_one({"id": role_id})
+    result = await roles_collection.delete_one({"id": role_id})
+    invalidate_role_cache()
     return result.deleted_count > 0
 
 def default_permissions() -> list[str]:
@@ -83,13 +127,15 @@ def default_permissions() -> list[str]:
         c.PERMISSION_READ_KNOWLEDGE
     ]
 
-roles_collection.update_one(
-    {"_id": "default"},
-    {
-        "$setOnInsert": {
-            "name": "guest",
-            "permissions": default_permissions(),
-        }
-    },
-    upsert=True
-)
+async def ensure_default_role() -> None:
+    await roles_collection.update_one(
+        {"_id": "default"},
+        {
+            "$setOnInsert": {
+                "name": "guest",
+                "permissions": default_permissions(),
+            }
+        },
+        upsert=True
+    )
+    invalidate_role_cache()
@@ -0,0 +1,163 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
+
+from app.bucket import (
+    GCS_UPLOAD_URL_EXPIRATION_SECONDS,
+    blob_url,
+    content_blob_name,
+    create_upload_url,
+    delete_image,
+    generate_variants,
+    get_blob_info,
+    md5_base64_to_hex,
+)
+from app.database import db
+from app.dto.upload.upload_intent_dto import UploadIntentCreate, UploadIntentDTO, UploadTarget
+from app.repository import exhibition_repository, outbox_repository, project_repository, user_repository
+
+# Clients upload files straight to the bucket: an intent reserves the object name and returns
+# where to PUT the bytes, and finalizing it attaches the stored object to its target. The object
+# is named after the declared MD5, which the bucket enforces on upload and finalize checks again.
+upload_intents_collection = db["upload_intents"]
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "image/svg+xml"}
+
+STATUS_PENDING = "pending"
+STATUS_FINALIZED = "finalized"
+
+def _target_folder(target: UploadTarget, target_id: str) -> str:
+    # Same folders as the multipart uploads in the repositories. Names differ (MD5 here, SHA-256
+    # there), so a file uploaded both ways is stored twice
+    if target == "project_logo":
+        return f"projects/{target_id}/logo"
+    if target == "project_image":
+        return f"projects/{target_id}/images"
+    if target == "user_profile_picture":
+        return f"users/{target_id}"
+    return f"exhibitions/{target_id}"
+
+def _target_collection(target: UploadTarget) -> AsyncCollection:
+    if target in ("project_logo", "project_image"):
+        return project_repository.project_collection
+    if target == "user_profile_picture":
+        return user_repository.users_collection
+    return exhibition_repository.exhibition_collection
+
+async def create_intent(intent: UploadIntentCreate, user_id: str) -> UploadIntentDTO:
+    if intent.content_type not in ALLOWED_CONTENT_TYPES:
+        raise ValueError(f"Unsupported content type {intent.content_type}")
+    if intent.size > UPLOAD_MAX_BYTES:
+        raise ValueError(f"File is larger than {UPLOAD_MAX_BYTES} bytes")
+    if not await _target_collection(intent.target).find_one({"_id": intent.target_id}, {"_id": 1}):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload target not found")
+
+    blob_name = f"public/{_target_folder(intent.target, intent.target_id)}/{content_blob_name(md5_base64_to_hex(intent.md5), intent.filename)}"
+    info = await get_blob_info(blob_name)
+    if info is not None and info["md5_hash"] != intent.md5:
+        # Whatever is stored under this name does not have the bytes the name claims
+        await delete_image(blob_url(blob_name))
+        info = None
+    exists = info is not None
+    upload_url, upload_headers = (
+        (None, {}) if exists else await create_upload_url(blob_name, intent.content_type, intent.size, intent.md5)
+    )
+
+    now = datetime.now(timezone.utc)
+    document = {
+        "_id": str(uuid.uuid4()),
+        "target": intent.target,
+        "target_id": intent.target_id,
+        "blob_name": blob_name,
+        "url": blob_url(blob_name),
+        "content_type": intent.content_type,
+        "size": intent.size,
+        "md5": intent.md5,
+        "status": STATUS_PENDING,
+        "exists": exists,
+        "created_by": user_id,
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=GCS_UPLOAD_URL_EXPIRATION_SECONDS),
+    }
+    await upload_intents_collection.insert_one(document)
+    # The upload URL is a credential, so it is handed out once and not stored
+    return UploadIntentDTO(**document, upload_url=upload_url, upload_headers=upload_headers)
+
+async def _attach(intent: dict[str, Any]) -> bool:
+    target, target_id, url = intent["target"], intent["target_id"], intent["url"]
+    if target == "project_logo":
+        attached = await project_repository.attach_logo(target_id, url)
+    elif target == "project_image":
+        attached = await project_repository.attach_image(target_id, url)
+    elif target == "user_profile_picture":
+        attached = await user_repository.attach_profile_picture(target_id, url)
+    else:
+        attached = await exhibition_repository.attach_image(target_id, url)
+    return attached is not None
+
+async def finalize_intent(intent_id: str, user_id: str) -> UploadIntentDTO:
+    """
+    Attach the uploaded object to the intent's target. The object's size, content type and the MD5
+    computed by the bucket are checked against the intent, but the object is never read here; its
+    variants are generated by the outbox worker. Finalizing twice returns the same result.
+    """
+    intent = await upload_intents_collection.find_one({"_id": intent_id, "created_by": user_id})
+    if intent is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload intent not found")
+    if intent["status"] == STATUS_FINALIZED:
+        return UploadIntentDTO(**intent)
+
+    expires_at = intent["expires_at"].replace(tzinfo=timezone.utc)
+    if expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload intent expired")
+
+    info = await get_blob_info(intent["blob_name"])
+    if info is None:
+        raise ValueError("The file has not been uploaded")
+    if info["md5_hash"] != intent["md5"] or info["size"] != intent["size"]:
+        # The object name claims this content, so anything else under it is removed
+        await delete_image(intent["url"])
+        raise ValueError("The uploaded file does not match the upload intent")
+    if info["content_type"] != intent["content_type"]:
+        if not intent["exists"]:
+            await delete_image(intent["url"])
+        raise ValueError("The uploaded file does not have the declared content type")
+
+    if not await _attach(intent):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload target not found")
+
+    intent = await upload_intents_collection.find_one_and_update(
+        {"_id": intent_id},
+        {"$set": {"status": STATUS_FINALIZED, "finalized_at": datetime.now(timezone.utc)}},
+        return_document=ReturnDocument.AFTER
+    )
+    await outbox_repository.enqueue(outbox_repository.KIND_UPLOAD_FINALIZED, intent_id)
+    return UploadIntentDTO(**intent)
+
+async def apply_variants(intent_id: str) -> dict[str, Any]:
+    """Create the variants of a finalized upload and record them on its target."""
+    intent = await upload_intents_collection.find_one({"_id": intent_id})
+    if intent is None:
+        return {"skipped": "upload intent not found"}
+
+    variants = await generate_variants(intent["blob_name"])
+    target, target_id, url = intent["target"], intent["target_id"], intent["url"]
+    if target == "project_logo":
+        updated = await project_repository.set_logo_variants(target_id, url, variants)
+    elif target == "project_image":
+        updated = await project_repository.set_image_variants(target_id, url, variants)
+    elif target == "user_profile_picture":
+        updated = await user_repository.set_profile_picture_variants(target_id, url, variants)
+    else:
+        updated = await exhibition_repository.set_image_variants(target_id, url, variants)
+    return {"variants": variants is not None, "updated": updated}
+
+async def get_intent(intent_id: str, user_id: str) -> Optional[UploadIntentDTO]:
+    intent = await upload_intents_collection.find_one({"_id": intent_id, "created_by": user_id})
+    return UploadIntentDTO(**intent) if intent else None
@@ -2,36 +2,52 @@ from typing import Optional, List
 import os
 
 from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
-from app.bucket import upload_image
+from app.bucket import upload_image, upload_image_with_variants, delete_image
 from app.database import db
+from app.model.image import ImageVariants
 from app.model.user import UserModel
 from app.dto.user.user_create_dto import UserCreate
+from app.dto.user.user_summary_dto import UserSummaryDTO, USER_SUMMARY_PROJECTION
+from app.dto.user.user_import_dto import UserImportResultDTO
 from app.model.role import RoleModel
+from app.dto.pagination.page_dto import Page
 import uuid
-import bcrypt
 from app.repository.roles_repository import get_role_by_id, get_default_role
-from app.repository import project_repository, review_repository
+from app.repository import outbox_repository
+from app.repository.pagination import DEFAULT_PAGE_SIZE, paginate, paginate_text_search
 from app.service.sendEmail import send_login_token_email
+from app.service.passwords import hash_password, hash_passwords, needs_rehash, verify_password
 from app.routes.security import create_access_token
 
 users_collection = db["users"]
-users_collection.create_index("email", unique=True) # TODO Fazer isso direto no mongo
 
-def get_user_by_id(user_id: str) -> Optional[UserModel]:
-    user_data = users_collection.find_one({"_id": user_id})
+async def get_user_by_id(user_id: str) -> Optional[UserModel]:
+    user_data = await users_collection.find_one({"_id": user_id})
     if user_data:
         return UserModel(**user_data)
     return None
 
-def list_all_users(name: Optional[str] = None, role_id: Optional[str] = None) -> list[UserModel]:
+async def list_all_users(
+    name: Optional[str] = None,
+    role_id: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    search: Optional[str] = None
+) -> Page[UserSummaryDTO]:
     query = {"deactivation_date": None}
     if name:
         query["name"] = {"$regex": name, "$options": "i"}
     if role_id:
         query["role._id"] = role_id
-    users_cursor = users_collection.find(query)
-    return [UserModel(**user) for user in users_cursor]
+    if search:
+        users, next_cursor = await paginate_text_search(users_collection, query, search, limit, cursor, USER_SUMMARY_PROJECTION)
+    else:
+        users, next_cursor = await paginate(users_collection, query, limit, cursor, USER_SUMMARY_PROJECTION)
+    return Page[UserSummaryDTO](items=[UserSummaryDTO(**user) for user in users], next_cursor=next_cursor)
 
 async def create_user(
     user: UserCreate, 
@@ -43,7 +59,7 @@ async def create_user(
     If email sending fails, the user is automatically deleted (rollback).
     """
 
-    role = get_role_by_id(user.role_id, requesting_role_permissions) if user.role_id else get_default_role()
+    role = await get_role_by_id(user.role_id, requesting_role_permissions) if user.role_id else await get_default_role()
     if role is None:
         raise ValueError("Invalid role ID" if user.role_id else "Default role not found")
     user.email = user.email.lower()
@@ -54,15 +70,16 @@ async def create_user(
         _id=user_id,
         **user_dump,
         role=role,
-        password=bcrypt.hashpw(user.password.encode("utf-8"), bcrypt.gensalt()),
+        password=await hash_password(user.password),
         verified=True
     )
 
     if profile_picture:
-        url = await upload_image(profile_picture, folder="/users")
+        url, variants = await upload_image_with_variants(profile_picture, folder=f"users/{user_id}")
         user_model.profile_picture = url
+        user_model.profile_picture_variants = variants
 
-    result = users_collection.insert_one(user_model.model_dump(by_alias=True))
+    result = await users_collection.insert_one(user_model.model_dump(by_alias=True))
     print("insert")
     if not result.inserted_id:
         print("not insert")
@@ -97,13 +114,13 @@ async def create_user(
     #
     #     # Send email
     #     print("send")
-    #     send_login_token_email(created_user.email, user_name, token_url)
+    #     await send_login_token_email(created_user.email, user_name, token_url)
     #     print("sent")
     # except Exception as email_error:
     #     # Rollback: delete the user if email fails
     #     try:
     #         print("rollback email")
-    #         delete_user(created_user.id)
+    #         await delete_user(created_user.id)
     #         raise RuntimeError(f"Error sending email user: {str(email_error)}")
     #     except Exception:
     #         pass
@@ -112,18 +129,99 @@ async def create_user(
     return created_user
 
 
+async def import_users(
+    rows: list[dict],
+    requesting_role_permissions: Optional[list[str]]
+) -> list[UserImportResultDTO]:
+    """
+    Create many users at once with the same rules as create_user (lowercased email, role
+    resolved against the requesting permissions, verified). Passwords are hashed in parallel
+    and the batch is inserted with a single unordered insert_many, so one bad row does not stop the others.
+    """
+    results: list[UserImportResultDTO] = []
+    pending: list[tuple[UserImportResultDTO, UserCreate]] = []
+    roles: dict[Optional[str], Optional[RoleModel]] = {}
+    seen_emails = set()
+
+    for row_number, row in enumerate(rows, start=1):
+        result = UserImportResultDTO(row=row_number, status="error")
+        results.append(result)
+        try:
+            user = UserCreate.model_validate(row)
+        except ValidationError as e:
+            result.email = row.get("email") if isinstance(row, dict) else None
+            result.detail = str(e)
+            continue
+
+        user.email = user.email.lower()
+        result.email = user.email
+        if user.email in seen_emails:
+            result.status = "duplicate"
+            result.detail = "Email repeated in import"
+            continue
+        seen_emails.add(user.email)
+
+        if user.role_id not in roles:
+            try:
+                roles[user.role_id] = await get_role_by_id(user.role_id, requesting_role_permissions) if user.role_id else await get_default_role()
+            except PermissionError as e:
+                result.detail = str(e)
+                continue
+        if roles[user.role_id] is None:
+            result.detail = "Invalid role ID" if user.role_id else "Default role not found"
+            continue
+        pending.append((result, user))
+
+    if not pending:
+        return results
+
+    hashed_passwords = await hash_passwords([user.password for _, user in pending])
+    documents = []
+    for (result, user), password in zip(pending, hashed_passwords):
+        user_dump = user.model_dump()
+        user_dump.pop("password")
+        user_model = UserModel(
+            _id=str(uuid.uuid4()),
+            **user_dump,
+            role=roles[user.role_id],
+            password=password,
+            verified=True
+        )
+        result.user_id = user_model.id
+        documents.append(user_model.model_dump(by_alias=True))
+
+    failed = {}
+    try:
+        await users_collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+
+    for index, (result, _) in enumerate(pending):
+        error = failed.get(index)
+        if error is None:
+            result.status = "created"
+        elif error.get("code") == 11000:
+            result.status = "duplicate"
+            result.detail = "Email already exists"
+            result.user_id = None
+        else:
+            result.detail = error.get("errmsg", "Insert failed")
+            result.user_id = None
+    return results
+
 async def update_user(user_id: str, update_data: UserModel, profile_picture: Optional[UploadFile]) -> Optional[UserModel]:
-    user_data = users_collection.find_one({"_id": user_id})
+    user_data = await users_collection.find_one({"_id": user_id})
     if user_data is None:
         raise ValueError("User not found")
     if profile_picture:
-        url = await upload_image(profile_picture, user_data.get("profile_picture"), folder="/users")
+        url, variants = await upload_image_with_variants(profile_picture, user_data.get("profile_picture"), folder=f"users/{user_id}")
         update_data.profile_picture = url
+        update_data.profile_picture_variants = variants
 
     user_dict = update_data.model_dump(exclude_unset=True)
-    users_collection.update_one({"_id": user_id}, {"$set": user_dict})
-    project_update = project_repository.update_project_with_user(user_id, update_data)
-    review_update = review_repository.update_reviews_with_user(user_id, update_data)
+    await users_collection.update_one({"_id": user_id}, {"$set": user_dict})
+    # Copies in projects and reviews are refreshed by the outbox worker
+    await outbox_repository.enqueue(outbox_repository.KIND_USER_UPDATED, user_id)
     return UserModel(**update_data.model_dump(by_alias=True))
 
 async def update_user_basic_info(
@@ -134,7 +232,7 @@ async def update_user_basic_info(
     requesting_role_permissions: list[str] = []
 
 ) -> UserModel:
-    user_data = users_collection.find_one({"_id": user_id})
+    user_data = await users_collection.find_one({"_id": user_id})
     if not user_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -144,93 +242,105 @@ async def update_user_basic_info(
         updates["name"] = name
 
     if role_id is not None:
-        role: Optional[RoleModel] = get_role_by_id(role_id, requesting_role_permissions)
+        role: Optional[RoleModel] = await get_role_by_id(role_id, requesting_role_permissions)
         if not role:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
         updates["role"] = role.model_dump(by_alias=True)
 
     if profile_picture is not None:
         old_url = user_data.get("profile_picture")
-        new_url = await upload_image(profile_picture, old_url, folder="/users")
+        new_url, variants = await upload_image_with_variants(profile_picture, old_url, folder=f"users/{user_id}")
         updates["profile_picture"] = new_url
+        updates["profile_picture_variants"] = variants.model_dump() if variants else None
 
     if not updates:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
 
-    users_collection.update_one({"_id": user_id}, {"$set": updates})
+    await users_collection.update_one({"_id": user_id}, {"$set": updates})
+    await outbox_repository.enqueue(outbox_repository.KIND_USER_UPDATED, user_id)
 
-    updated_user = users_collection.find_one({"_id": user_id})
+    updated_user = await users_collection.find_one({"_id": user_id})
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found after update")
     return UserModel(**updated_user)
 
 
-def update_users_with_role(role_id: str, updated_role: RoleModel) -> int:
-    result = users_collection.update_many(
-        {"role.id": role_id},
+async def update_users_with_role(role_id: str, updated_role: RoleModel) -> int:
+    result = await users_collection.update_many(
+        {"role._id": role_id},
         {"$set": {"role": updated_role.model_dump(by_alias=True)}}
     )
     return result.modified_count
 
-def delete_user(user_id: str) -> bool:
-    result = users_collection.delete_one({"_id": user_id})
+async def delete_user(user_id: str) -> bool:
+    result = await users_collection.delete_one({"_id": user_id})
     return result.deleted_count > 0
 
-def get_user_by_email(email: str):
-    user_data = users_collection.find_one({"email": email.lower()})
+async def get_user_by_email(email: str):
+    user_data = await users_collection.find_one({"email": email.lower()})
     if user_data:
         return UserModel(**user_data)
     return None
 
-def authenticate_user(email: str, password: str) -> UserModel | None:
-    user = get_user_by_email(email)
-    if user and bcrypt.checkpw(password.encode("utf-8"), user.password):
+async def authenticate_user(email: str, password: str) -> UserModel | None:
+    user = await get_user_by_email(email)
+    if user and await verify_password(password, user.password):
+        if needs_rehash(user.password):
+            # Upgrade hashes made with an older cost factor while the plain password is at hand.
+            # Matching on the old hash keeps a concurrent password change from being overwritten.
+            new_hash = await hash_password(password)
+            result = await users_collection.update_one(
+                {"_id": user.id, "password": user.password},
+                {"$set": {"password": new_hash}}
+            )
+            if result.modified_count > 0:
+                user.password = new_hash
         return user
     return None
 
 
-def set_project_id_on_users(user_ids: list[str], project_id: str) -> None:
+async def set_project_id_on_users(user_ids: list[str], project_id: str) -> None:
     if not user_ids:
         return
-    users_collection.update_many(
+    await users_collection.update_many(
         {"_id": {"$in": user_ids}},
         {"$set": {"project_id": project_id}}
     )
 
 
-def set_project(project_id: str, project_resume: dict) -> None:
-    users_collection.update_many(
+async def set_project(project_id: str, project_resume: dict) -> None:
+    await users_collection.update_many(
         {"project._id": project_id},
         {"$set": {"project": project_resume}}
     )
 
 
-def set_project_resume_on_users_by_ids(user_ids: list[str], project_resume: dict) -> None:
+async def set_project_resume_on_users_by_ids(user_ids: list[str], project_resume: dict) -> None:
     if not user_ids:
         return
-    users_collection.update_many(
+    await users_collection.update_many(
         {"_id": {"$in": user_ids}},
         {"$set": {"project": project_resume}}
     )
 
 
-def unset_project_by_project_id(project_id: str) -> None:
-    users_collection.update_many(
+async def unset_project_by_project_id(project_id: str) -> None:
+    await users_collection.update_many(
         {"project._id": project_id},
         {"$unset": {"project": ""}}
     )
 
-def is_role_in_use(role_id: str) -> bool:
-    user = users_collection.find_one({"role.id": role_id, "deactivation_date": {"$exists": False}})
+async def is_role_in_use(role_id: str) -> bool:
+    user = await users_collection.find_one({"role._id": role_id, "deactivation_date": {"$exists": False}})
     return user is not None
   
-def get_users_by_role(role_id: str) -> list[UserModel]:
-    users_data = users_collection.find({"role.id": role_id})
-    return [UserModel(**user) for user in users_data]
+async def get_users_by_role(role_id: str) -> list[UserModel]:
+    users_data = users_collection.find({"role._id": role_id})
+    return [UserModel(**user) async for user in users_data]
 
 
-def favorite_project(user_id: str, project_id: str):
-    user = users_collection.find_one({"_id": user_id})
+async def favorite_project(user_id: str, project_id: str):
+    user = await users_collection.find_one({"_id": user_id})
     if not user or "favorited_projects" not in user:
         raise Exception("User not updated")
 
@@ -245,7 +355,7 @@ def favorite_project(user_id: str, project_id: str):
         new_projects = favorited_projects + [project_id]
         action_result = True
 
-    result = users_collection.update_one(
+    result = await users_collection.update_one(
         {"_id": user_id},
         {"$set": {"favorited_projects": new_projects}}
     )
@@ -255,14 +365,43 @@ def favorite_project(user_id: str, project_id: str):
 
 async def upload_profile_picture(user_id: Optional[str], file: UploadFile) -> str:
     if user_id:
-        user = users_collection.find_one({"_id": user_id})
+        user = await users_collection.find_one({"_id": user_id})
         if not user:
             raise ValueError("User not found")
 
-    url = await upload_image(file, user.get("profile_picture") if user_id else None, folder="/users")
+    url = await upload_image(
+        file,
+        user.get("profile_picture") if user_id else None,
+        folder=f"users/{user_id}" if user_id else "users"
+    )
     return url
 
-def add_review_to_user(user_id: str, review_id: str, project_id: str, exhibition_id: str, comment: Optional[str], criteria: Optional[List[dict]] = None) -> None:
+async def attach_profile_picture(user_id: str, picture_url: str) -> Optional[UserModel]:
+    """Make an object already in the bucket the user's profile picture, replacing the previous one."""
+    user_data = await users_collection.find_one({"_id": user_id})
+    if not user_data:
+        return None
+    old_url = user_data.get("profile_picture")
+    if old_url == picture_url:
+        return UserModel(**user_data)
+
+    await users_collection.update_one(
+        {"_id": user_id},
+        {"$set": {"profile_picture": picture_url, "profile_picture_variants": None}}
+    )
+    await outbox_repository.enqueue(outbox_repository.KIND_USER_UPDATED, user_id)
+    if old_url:
+        await delete_image(old_url)
+    return await get_user_by_id(user_id)
+
+async def set_profile_picture_variants(user_id: str, picture_url: str, variants: Optional[ImageVariants]) -> bool:
+    result = await users_collection.update_one(
+        {"_id": user_id, "profile_picture": picture_url},
+        {"$set": {"profile_picture_variants": variants.model_dump() if variants else None}}
+    )
+    return result.modified_count > 0
+
+async def add_review_to_user(user_id: str, review_id: str, project_id: str, exhibition_id: str, comment: Optional[str], criteria: Optional[List[dict]] = None) -> None:
     review_resume = {
         "_id": review_id,
         "project_id": project_id,
@@ -273,7 +412,7 @@ def add_review_to_user(user_id: str, review_id: str, project_id: str, exhibition
         review_resume["criteria"] = criteria
 
     # Upsert logic: update if exists, else push
-    result = users_collection.update_one(
+    result = await users_collection.update_one(
         {
             "_id": user_id,
             "reviews": {
@@ -293,7 +432,7 @@ def add_review_to_user(user_id: str, review_id: str, project_id: str, exhibition
     )
     if result.modified_count == 0:
         # If not found, push new review
-        result = users_collection.update_one(
+        result = await users_collection.update_one(
             {"_id": user_id},
             {"$push": {"reviews": review_resume}}
         )
@@ -301,7 +440,16 @@ def add_review_to_user(user_id: str, review_id: str, project_id: str, exhibition
             raise ValueError("User not found or not updated")
 
 
-def add_project_to_user(user_id: str, project_resume: UserModel.ProjectResume) -> Optional[UserModel]:
-    result = users_collection.update_one({"_id": user_id},{"$set": {"project": project_resume.model_dump(by_alias=True)}})
+async def replace_user_reviews(user_id: str, review_ids: List[str], review_resumes: List[dict]) -> None:
+    # Both updates go in one ordered round trip: the $pull must run before the $push
+    result = await users_collection.bulk_write([
+        UpdateOne({"_id": user_id}, {"$pull": {"reviews": {"_id": {"$in": review_ids}}}}),
+        UpdateOne({"_id": user_id}, {"$push": {"reviews": {"$each": review_resumes}}}),
+    ], ordered=True)
+    if result.matched_count == 0:
+        raise ValueError("User not found or not updated")
+
+async def add_project_to_user(user_id: str, project_resume: UserModel.ProjectResume) -> Optional[UserModel]:
+    result = await users_collection.update_one({"_id": user_id},{"$set": {"project": project_resume.model_dump(by_alias=True)}})
     if result.matched_count == 0:
         raise ValueError("User not found")
@@ -0,0 +1,13 @@
+from typing import Any
+
+def bump_version(update: dict[str, Any]) -> dict[str, Any]:
+    """
+    Add the `version` increment and `updated_at` refresh to a Mongo update document.
+    Every write to a versioned collection (exhibitions, projects) goes through this so
+    the ETag / Last-Modified validators served by the read routes change with the data.
+    """
+    return {
+        **update,
+        "$inc": {**update.get("$inc", {}), "version": 1},
+        "$currentDate": {**update.get("$currentDate", {}), "updated_at": True},
+    }
@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from pymongo import ASCENDING
+from pymongo.asynchronous.collection import AsyncCollection
+
+# Shared lease-based job queue on top of a Mongo collection, used by the outbox and the
+# email queue. Jobs move pending -> processing -> done, or back to pending with a backoff
+# until max_attempts is reached and they are marked failed.
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+def new_job(fields: dict[str, Any]) -> dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": str(uuid.uuid4()),
+        **fields,
+        "status": STATUS_PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+async def claim_batch(collection: AsyncCollection, limit: int, lease_seconds: float) -> list[dict[str, Any]]:
+    """
+    Atomically take up to `limit` due jobs for this worker. Jobs whose lease expired
+    (the worker that claimed them died) are due again.
+    """
+    now = datetime.now(timezone.utc)
+    due = {
+        "$or": [
+            {"status": STATUS_PENDING, "next_attempt_at": {"$lte": now}},
+            {"status": STATUS_PROCESSING, "lease_until": {"$lte": now}},
+        ]
+    }
+    candidate_ids = [
+        job["_id"]
+        async for job in collection.find(due, {"_id": 1}).sort("created_at", ASCENDING).limit(limit)
+    ]
+    if not candidate_ids:
+        return []
+
+    claim = str(uuid.uuid4())
+    # Re-checking `due` makes the claim safe against other workers picking the same candidates
+    await collection.update_many(
+        {"_id": {"$in": candidate_ids}, **due},
+        {"$set": {
+            "status": STATUS_PROCESSING,
+            "claim": claim,
+            "lease_until": now + timedelta(seconds=lease_seconds),
+            "updated_at": now,
+        }}
+    )
+    return await collection.find({"claim": claim}).sort("created_at", ASCENDING).to_list()
+
+async def renew_lease(collection: AsyncCollection, job: dict[str, Any], lease_seconds: float) -> bool:
+    """
+    Extend the lease of a claimed job before working on it. False when another worker
+    re-claimed it after the lease expired, in which case it must be left alone.
+    """
+    now = datetime.now(timezone.utc)
+    result = await collection.update_one(
+        {"_id": job["_id"], "claim": job["claim"], "status": STATUS_PROCESSING},
+        {"$set": {"lease_until": now + timedelta(seconds=lease_seconds), "updated_at": now}}
+    )
+    return result.matched_count > 0
+
+async def mark_done(collection: AsyncCollection, job_ids: list[str], fields: Optional[dict[str, Any]] = None) -> None:
+    now = datetime.now(timezone.utc)
+    await collection.update_many(
+        {"_id": {"$in": job_ids}},
+        {
+            # completed_at carries the TTL index that purges old jobs (see app/indexes.py)
+            "$set": {**(fields or {}), "status": STATUS_DONE, "updated_at": now, "completed_at": now},
+            "$unset": {"claim": "", "lease_until": ""},
+        }
+    )
+
+async def mark_failed(collection: AsyncCollection, job: dict[str, Any], error: str, max_attempts: int) -> None:
+    """Schedule a retry with exponential backoff, or give up after max_attempts."""
+    now = datetime.now(timezone.utc)
+    attempts = job.get("attempts", 0) + 1
+    update: dict[str, Any] = {"attempts": attempts, "last_error": error, "updated_at": now}
+    if attempts >= max_attempts:
+        update["status"] = STATUS_FAILED
+    else:
+        update["status"] = STATUS_PENDING
+        update["next_attempt_at"] = now + timedelta(seconds=min(2 ** attempts, 300))
+    await collection.update_one(
+        {"_id": job["_id"]},
+        {"$set": update, "$unset": {"claim": "", "lease_until": ""}}
+    )
+
+async def count_by_status(collection: AsyncCollection) -> dict[str, int]:
+    counts = {STATUS_PENDING: 0, STATUS_PROCESSING: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+    cursor = await collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}])
+    async for row in cursor:
+        counts[row["_id"]] = row["count"]
+    return counts
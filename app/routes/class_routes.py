@@ -1,4 +1,4 @@
-from app.routes.security import User, get_current_user
+from app.routes.security import User, require_permission
 from fastapi import APIRouter, HTTPException, Depends, status
 from typing import Annotated, List
 from app.repository import class_repository
@@ -14,20 +14,14 @@ router = APIRouter(
 @router.get("", response_model=List[ClassModel])
 async def list_classes():
     try:
-        return class_repository.get_all_class()
+        return await class_repository.get_all_class()
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.get("/{class_id}", response_model=ClassModel)
-async def get_class(class_id: str, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_CLASS not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def get_class(class_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_CLASS))]):
     try:
-        class_data = class_repository.get_class_by_id(class_id)
+        class_data = await class_repository.get_class_by_id(class_id)
         if not class_data:
             raise HTTPException(status_code=404, detail="Class not found")
         return class_data
@@ -35,15 +29,9 @@ async def get_class(class_id: str, current_user: Annotated[User, Depends(get_cur
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.post("", response_model=ClassModel)
-async def create_class(class_dto: ClassCreateDTO, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_CREATE_CLASS not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def create_class(class_dto: ClassCreateDTO, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_CLASS))]):
     try:
-        created = class_repository.create_class(class_dto.name, class_dto.year)
+        created = await class_repository.create_class(class_dto.name, class_dto.year)
         if not created:
             raise HTTPException(status_code=400, detail="Failed to create class")
         return created
@@ -51,15 +39,9 @@ async def create_class(class_dto: ClassCreateDTO, current_user: Annotated[User,
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.put("/{class_id}", response_model=ClassModel)
-async def update_class(class_id: str, class_update: ClassCreateDTO, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_UPDATE_CLASS not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def update_class(class_id: str, class_update: ClassCreateDTO, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_CLASS))]):
     try:
-        updated = class_repository.update_class(class_id, class_update)
+        updated = await class_repository.update_class(class_id, class_update)
         if not updated:
             raise HTTPException(status_code=404, detail="Class not found or not updated")
         return updated
@@ -67,15 +49,9 @@ async def update_class(class_id: str, class_update: ClassCreateDTO, current_user
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.delete("/{class_id}", response_model=dict)
-async def delete_class(class_id: str, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_DELETE_CLASS not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def delete_class(class_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_DELETE_CLASS))]):
     try:
-        deleted = class_repository.delete_class(class_id)
+        deleted = await class_repository.delete_class(class_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Class not found")
         return {"message": "Class deleted successfully"}
@@ -1,4 +1,4 @@
-from app.routes.security import User, get_current_user
+from app.routes.security import User, require_permission
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import Annotated, List
 from app.model.company import CompanyModel
@@ -24,24 +24,18 @@ async def get_all_companies():
     Retrieve all companies
     """
     try:
-        companies = get_all_company()
+        companies = await get_all_company()
         return companies
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Error retrieving companies: {str(e)}")
 
 @router.post("/", response_model=CompanyModel, status_code=status.HTTP_201_CREATED)
-async def create_new_company(company_data: CompanyDTO, current_user: Annotated[User, Depends(get_current_user)]):
+async def create_new_company(company_data: CompanyDTO, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_COMPANY))]):
     """
     Create a new company
     """
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_CREATE_COMPANY not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
-        new_company = create_company(company_data.name)
+        new_company = await create_company(company_data.name)
         if new_company == None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -52,18 +46,12 @@ async def create_new_company(company_data: CompanyDTO, current_user: Annotated[U
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Error creating company: {str(e)}")
 
 @router.put("/{company_id}", response_model=CompanyModel)
-async def update_existing_company(company_id: str, company_data: CompanyDTO, current_user: Annotated[User, Depends(get_current_user)]):
+async def update_existing_company(company_id: str, company_data: CompanyDTO, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_COMPANY))]):
     """
     Update an existing company
     """
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_UPDATE_COMPANY not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
-        existing_company = get_company_by_id(company_id)
+        existing_company = await get_company_by_id(company_id)
         if not existing_company:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -75,7 +63,7 @@ async def update_existing_company(company_id: str, company_data: CompanyDTO, cur
             name=company_data.name
         )
         
-        updated_company = update_company(updated_company_model)
+        updated_company = await update_company(updated_company_model)
         if not updated_company:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -87,19 +75,13 @@ async def update_existing_company(company_id: str, company_data: CompanyDTO, cur
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Error updating company: {str(e)}")
 
 @router.delete("/{company_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_existing_company(company_id: str, current_user: Annotated[User, Depends(get_current_user)]):
+async def delete_existing_company(company_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_DELETE_COMPANY))]):
     """
     Delete a company
     """
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_DELETE_COMPANY not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
         # First check if company exists
-        existing_company = get_company_by_id(company_id)
+        existing_company = await get_company_by_id(company_id)
         if not existing_company:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -107,7 +89,7 @@ async def delete_existing_company(company_id: str, current_user: Annotated[User,
             )
         
         # Delete company
-        success = delete_company(company_id)
+        success = await delete_company(company_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,12 +1,14 @@
 from datetime import datetime
 from typing import Annotated, List, Optional
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Query
-from app.routes.security import User, get_current_user
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Query, Request, Response
+from app.routes.security import User, require_permission
+from app.routes.conditional import conditional_response, make_etag
 from app.dto.exhibition.exhibition_resume_dto import ExhibitionResumeDTO
+from app.dto.exhibition.exhibition_leaderboard_dto import LeaderboardEntryDTO
 
 from app.dto.exhibition.exhibition_update_dto import ExhibitionUpdate
 from app.model.exhibition import ExhibitionModel
-from app.repository import exhibition_repository
+from app.repository import exhibition_repository, review_repository
 from app.dto.exhibition.exhibition_create_dto import ExhibitionCreate
 import app.constants as c
 import json
@@ -18,18 +20,13 @@ router = APIRouter(
 
 @router.get("", response_model=List[ExhibitionResumeDTO])
 async def list_exhibitions(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_EXHIBITION))],
     name: Optional[str] = Query(None, description="Name of the exhibition"),
-    start_date: Optional[datetime] = Query(None, description="Start date of the exhibition")
+    start_date: Optional[datetime] = Query(None, description="Start date of the exhibition"),
+    search: Optional[str] = Query(None, description="Full-text search with relevance ordering (uses the text index)")
 ):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_EXHIBITION not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
-        return exhibition_repository.get_all_exhibition(name, start_date)
+        return await exhibition_repository.get_all_exhibition(name, start_date, search)
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -38,14 +35,8 @@ async def update_exhibition(
     exhibition_id: str,
     exhibition: ExhibitionUpdate | str = Form(...),
     image: UploadFile = File(None),
-    current_user: Annotated[User, Depends(get_current_user)] = None
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_EXHIBITION))] = None
 ):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_UPDATE_EXHIBITION not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     # HANDLE EXHIBITION DATA PARSING
     try:
         if isinstance(exhibition, str):
@@ -65,19 +56,13 @@ async def update_exhibition(
 async def create_exhibition(
     exhibition: ExhibitionCreate | str = Form(...),
     image: UploadFile = File(None),
-    current_user: Annotated[User, Depends(get_current_user)] = None
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_EXHIBITION))] = None
 ):
     """
     Create a new exhibition.
     - exhibition: ExhibitionCreate data (as JSON string in 'exhibition' form field)
     - image: Optional image file for the exhibition
     """
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_CREATE_EXHIBITION not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     # HANDLE EXHIBITION DATA PARSING
     try:
         if isinstance(exhibition, str):
@@ -94,46 +79,46 @@ async def create_exhibition(
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.delete("/{exhibition_id}", response_model=bool)
-async def delete_exhibition(exhibition_id: str, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_DELETE_EXHIBITION not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def delete_exhibition(exhibition_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_DELETE_EXHIBITION))]):
     try:
-        return exhibition_repository.delete_exhibition(exhibition_id)
+        return await exhibition_repository.delete_exhibition(exhibition_id)
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.get("/{exhibition_id}", response_model=ExhibitionModel)
-async def get_exhibition_by_id(exhibition_id: str, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_EXHIBITION not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def get_exhibition_by_id(
+    exhibition_id: str,
+    request: Request,
+    response: Response,
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_EXHIBITION))]
+):
     try:
-        exhibition = exhibition_repository.get_exhibition_by_id(exhibition_id)
+        exhibition = await exhibition_repository.get_exhibition_by_id(exhibition_id)
         if exhibition is None:
             raise HTTPException(status_code=404, detail="Exhibition not found")
-        return exhibition
+        not_modified = conditional_response(request, response, make_etag(exhibition.id, exhibition.version), exhibition.updated_at)
+        return not_modified or exhibition
+    except Exception as e:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
+
+@router.get("/{exhibition_id}/leaderboard", response_model=List[LeaderboardEntryDTO])
+async def get_exhibition_leaderboard(exhibition_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_REVIEW))]):
+    try:
+        return await review_repository.get_exhibition_leaderboard(exhibition_id)
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.get("/current/", response_model=ExhibitionModel)
-async def get_exhibition_by_current_date(current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_EXHIBITION not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def get_exhibition_by_current_date(
+    request: Request,
+    response: Response,
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_EXHIBITION))]
+):
     try:
-        exhibition = exhibition_repository.get_exhibition_by_current_date()
+        exhibition = await exhibition_repository.get_exhibition_by_current_date()
         if exhibition is None:
             raise HTTPException(status_code=404, detail="Exhibition not found")
-        return exhibition
+        not_modified = conditional_response(request, response, make_etag(exhibition.id, exhibition.version), exhibition.updated_at)
+        return not_modified or exhibition
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
@@ -1,5 +1,5 @@
 from typing_extensions import Annotated
-from app.routes.security import User, get_current_user
+from app.routes.security import User, require_permission
 from fastapi import APIRouter, HTTPException, Depends, status
 from app.repository import knowledge_repository
 from typing import List
@@ -15,20 +15,14 @@ router = APIRouter(
 @router.get("", response_model=List[KnowledgeModel])
 async def get_all_knowledge():
     try:
-        return knowledge_repository.get_all_knowledge()
+        return await knowledge_repository.get_all_knowledge()
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.get("/{knowledge_id}", response_model=KnowledgeModel)
-async def get_knowledge_by_id(knowledge_id: str, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_KNOWLEDGE not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def get_knowledge_by_id(knowledge_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_KNOWLEDGE))]):
     try:
-        knowledge_data = knowledge_repository.get_knowledge_by_id(knowledge_id)
+        knowledge_data = await knowledge_repository.get_knowledge_by_id(knowledge_id)
         if knowledge_data is None:
             raise HTTPException(status_code=404, detail="Knowledge not found")
         return knowledge_data
@@ -36,15 +30,9 @@ async def get_knowledge_by_id(knowledge_id: str, current_user: Annotated[User, D
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.post("", response_model=KnowledgeModel)
-async def create_knowledge(knowledge_dto: KnowledgeCreateDTO, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_CREATE_KNOWLEDGE not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def create_knowledge(knowledge_dto: KnowledgeCreateDTO, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_KNOWLEDGE))]):
     try:
-        knowledge_created = knowledge_repository.create_knowledge(knowledge_dto.name)
+        knowledge_created = await knowledge_repository.create_knowledge(knowledge_dto.name)
         if knowledge_created is None:
             raise HTTPException(status_code=400, detail="Failed to create knowledge")
         return knowledge_created
@@ -52,15 +40,9 @@ async def create_knowledge(knowledge_dto: KnowledgeCreateDTO, current_user: Anno
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.put("/{knowledge_id}", response_model=KnowledgeModel)
-async def update_knowledge(knowledge_id: str, knowledge_update: KnowledgeCreateDTO, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_UPDATE_KNOWLEDGE not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def update_knowledge(knowledge_id: str, knowledge_update: KnowledgeCreateDTO, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_KNOWLEDGE))]):
     try:
-        updated = knowledge_repository.update_knowledge(knowledge_id, knowledge_update)
+        updated = await knowledge_repository.update_knowledge(knowledge_id, knowledge_update)
         if updated is None:
             raise HTTPException(status_code=404, detail="Knowledge not found or not updated")
         return updated
@@ -68,15 +50,9 @@ async def update_knowledge(knowledge_id: str, knowledge_update: KnowledgeCreateD
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 @router.delete("/{knowledge_id}", response_model=dict)
-async def delete_knowledge(knowledge_id: str, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_DELETE_KNOWLEDGE not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def delete_knowledge(knowledge_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_DELETE_KNOWLEDGE))]):
     try:
-        knowledge_deleted = knowledge_repository.delete_knowledge(knowledge_id)
+        knowledge_deleted = await knowledge_repository.delete_knowledge(knowledge_id)
         if not knowledge_deleted:
             raise HTTPException(status_code=404, detail="Knowledge not found")
         return {"message": "Knowledge deleted successfully"}
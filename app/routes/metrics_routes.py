@@ -0,0 +1,28 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends
+from app.routes.security import User, require_permission
+from app.dto.metrics.mongo_pool_dto import MongoPoolMetricsDTO, MongoPoolSettingsDTO
+from app.database import MONGO_COMPRESSORS, client
+from app.pool_metrics import pool_metrics
+from app import constants as c
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+def _seconds_to_ms(value):
+    return value * 1000 if value is not None else None
+
+@router.get("/mongo-pool", response_model=MongoPoolMetricsDTO)
+async def get_mongo_pool_metrics(current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_USER))]):
+    """Connection pool counters since startup, to tell pool starvation apart from slow queries."""
+    options = client.options.pool_options
+    settings = MongoPoolSettingsDTO(
+        max_pool_size=options.max_pool_size,
+        min_pool_size=options.min_pool_size,
+        max_idle_time_ms=_seconds_to_ms(options.max_idle_time_seconds),
+        wait_queue_timeout_ms=_seconds_to_ms(options.wait_queue_timeout),
+        compressors=[name.strip() for name in (MONGO_COMPRESSORS or "").split(",") if name.strip()],
+    )
+    return MongoPoolMetricsDTO(**pool_metrics.snapshot(), settings=settings)
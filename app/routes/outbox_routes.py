@@ -0,0 +1,25 @@
+from typing import Annotated
+from fastapi import APIRouter, HTTPException, status, Depends
+from app.routes.security import User, require_permission
+from app.dto.outbox.outbox_event_dto import OutboxEventDTO, OutboxStatusDTO
+from app.repository import outbox_repository
+from app import constants as c
+
+router = APIRouter(
+    prefix="/outbox",
+    tags=["Outbox"]
+)
+
+@router.get("/status", response_model=OutboxStatusDTO)
+async def get_outbox_status(current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_USER))]):
+    try:
+        return OutboxStatusDTO(**await outbox_repository.count_by_status())
+    except Exception as e:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
+
+@router.get("/{event_id}", response_model=OutboxEventDTO)
+async def get_outbox_event(event_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_USER))]):
+    event = await outbox_repository.get_event(event_id)
+    if event is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Event not found")
+    return OutboxEventDTO(**event)
@@ -1,17 +1,21 @@
 from typing_extensions import Annotated
 from watchfiles import awatch
 
-from app.routes.security import User, get_current_user
-from fastapi import APIRouter, HTTPException, status, Query, Depends, status
-from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form
+from app.routes.security import User, get_current_user, require_permission
+from fastapi import APIRouter, HTTPException, status, Query, Depends, UploadFile, File, Form, Request, Response
+from app.routes.conditional import conditional_response, make_etag
 from app.repository import project_repository
 from app.model.project import ProjectModel
+from app.dto.pagination.page_dto import Page
+from app.dto.project.project_summary_dto import ProjectSummaryDTO
+from app.dto.project.project_score_dto import ProjectScoreDTO
+from app.repository.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.dto.project.project_create_dto import ProjectCreateDto
 from app.dto.project.project_update_dto import ProjectUpdateDto
 from typing import List, Optional
 from pymongo.errors import DuplicateKeyError, OperationFailure
 from bson.errors import InvalidId
-from app.repository import exhibition_repository, user_repository
+from app.repository import exhibition_repository, user_repository, project_score_repository
 import app.constants as c
 import json
 
@@ -20,26 +24,35 @@ router = APIRouter(
     tags=["Projects"]
 )
 
-@router.get("", response_model=List[ProjectModel])
+@router.get("", response_model=Page[ProjectSummaryDTO])
 async def list_projects(
-    current_user: Annotated[User, Depends(get_current_user)],
+    request: Request,
+    response: Response,
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_PROJECT))],
     exhibition_id: Optional[str] = Query(None, description="ID da exposição para filtrar projetos"),
     project_name: Optional[str] = Query(None, description="Nome do projeto para busca parcial"),
-    company_name: Optional[str] = Query(None, description="Nome da empresa para busca parcial")
+    company_name: Optional[str] = Query(None, description="Nome da empresa para busca parcial"),
+    search: Optional[str] = Query(None, description="Busca textual por nome, empresa e descrição, ordenada por relevância"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página"),
+    cursor: Optional[str] = Query(None, description="next_cursor retornado pela página anterior")
 ):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_PROJECT not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
-        projects = project_repository.get_projects_with_filters(
+        projects = await project_repository.get_projects_with_filters(
             exhibition_id=exhibition_id,
             project_name=project_name,
-            company_name=company_name
+            company_name=company_name,
+            limit=limit,
+            cursor=cursor,
+            search=search
+        )
+        # The page changes exactly when one of its projects (or the next page boundary) does
+        etag = make_etag(*(f"{project.id}:{project.version}" for project in projects.items), projects.next_cursor)
+        return conditional_response(request, response, etag) or projects
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
         )
-        return projects
     except InvalidId:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -59,14 +72,8 @@ async def list_projects(
 @router.get("/{project_id}", response_model=ProjectModel)
 async def get_project(
     project_id: str, 
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_PROJECT))]
 ):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_PROJECT not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     if not project_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,7 +81,7 @@ async def get_project(
         )
     
     try:
-        project = project_repository.get_project_by_id(project_id)
+        project = await project_repository.get_project_by_id(project_id)
         if project is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, 
@@ -99,12 +106,34 @@ async def get_project(
             detail="Erro interno do servidor"
         )
         
+@router.get("/{project_id}/score", response_model=ProjectScoreDTO)
+async def get_project_score(
+    project_id: str,
+    current_user: Annotated[User, Depends(get_current_user)]
+):
+    if not current_user:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
+    if not current_user.verified:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
+    if c.PERMISSION_READ_REVIEW not in current_user.permissions and current_user.project_id != project_id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+    try:
+        score = await project_score_repository.get_project_score(project_id)
+        if score is None:
+            return ProjectScoreDTO(project_id=project_id)
+        return score
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor"
+        )
+
 @router.post("", response_model=ProjectModel)
 async def create_project(
     project: ProjectCreateDto | str = Form(...),
     logo: UploadFile = File(None),
     images: List[UploadFile] = File(None),
-    current_user: Annotated[User, Depends(get_current_user)] = None
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_PROJECT))] = None
 ):
     """
     Create a new project.
@@ -113,12 +142,6 @@ async def create_project(
     - images: Optional list of image files for the project
     """
     # HANDLE PROJECT DATA PARSING
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_CREATE_PROJECT not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
         if isinstance(project, str):
             project_create_data = ProjectCreateDto.model_validate_json(project)
@@ -139,7 +162,7 @@ async def update_project(
     project: ProjectUpdateDto | str = Form(...),
     logo: UploadFile = File(None),
     images: List[UploadFile] = File(None),
-    current_user: Annotated[User, Depends(get_current_user)] = None
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_UPDATE_PROJECT))] = None
 ):
     """
     Update a project.
@@ -148,12 +171,6 @@ async def update_project(
     - logo: Optional logo image file for the project
     - images: Optional list of image files for the project
     """
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_UPDATE_PROJECT not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     # HANDLE PROJECT DATA PARSING
     try:
         if isinstance(project, str):
@@ -173,14 +190,8 @@ async def update_project(
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: str,
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_DELETE_PROJECT))]
 ):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_DELETE_PROJECT not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     if not project_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -188,14 +199,14 @@ async def delete_project(
         )
     
     try:
-        existing_project = project_repository.get_project_by_id(project_id)
+        existing_project = await project_repository.get_project_by_id(project_id)
         if existing_project is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Projeto não encontrado"
             )
         
-        result = project_repository.delete_project_by_id(project_id)
+        result = await project_repository.delete_project_by_id(project_id)
         if not result:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -215,7 +226,7 @@ async def delete_project(
         )
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro interno do servidor"
@@ -1,83 +1,119 @@
-from typing import List, Annotated, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from app.model.review import ReviewModel
+from app.dto.pagination.page_dto import Page
 from app.repository import review_repository
+from app.repository.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.dto.review.review_resume_dto import ReviewResume
 from app.dto.review.review_create_dto import ReviewCreate
-from app.routes.security import User, get_current_user
+from app.dto.review.review_bulk_dto import ReviewBulkCreate, ReviewBulkResultDTO
+from app.routes.security import User, get_current_user, require_permission
+from app.service.review_export import ndjson_lines, csv_lines
 from app import constants as c
 router = APIRouter(
     prefix="/reviews",
     tags=["Reviews"]
 )
 
-@router.get("", response_model=List[ReviewModel])
-async def list_reviews(current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_REVIEW not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+@router.get("", response_model=Page[ReviewModel])
+async def list_reviews(
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_REVIEW))],
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
+):
     try:
-        return review_repository.get_all_reviews()
+        return await review_repository.get_all_reviews(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
 
-@router.post("", response_model=ReviewModel)
-async def create_review(review: ReviewCreate, current_user: Annotated[User, Depends(get_current_user)]):
+@router.get("/export")
+async def export_reviews(
+    current_user: Annotated[User, Depends(get_current_user)],
+    exhibition_id: Optional[str] = Query(None, description="Only reviews of this exhibition"),
+    project_id: Optional[str] = Query(None, description="Only reviews of this project"),
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="ndjson: one review per line; csv: one row per review criterion")
+):
+    """
+    Stream reviews as they are read from the database, so memory use does not grow with the exhibition size.
+    Users without read_review permission can only export their own project, without reviewer data.
+    """
     if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
     if not current_user.verified:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_CREATE_REVIEW not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+    can_read_all = c.PERMISSION_READ_REVIEW in current_user.permissions
+    if not can_read_all:
+        if not current_user.project_id:
+            raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        if project_id and project_id != current_user.project_id:
+            raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        project_id = current_user.project_id
+
+    reviews = review_repository.iter_reviews(exhibition_id, project_id)
+    if format == "csv":
+        return StreamingResponse(
+            csv_lines(reviews, resume_only=not can_read_all),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="reviews.csv"'}
+        )
+    return StreamingResponse(ndjson_lines(reviews, resume_only=not can_read_all), media_type="application/x-ndjson")
+
+
+@router.post("", response_model=ReviewModel)
+async def create_review(review: ReviewCreate, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_REVIEW))]):
     
     try:
-        created = review_repository.create_review(review, current_user)
+        created = await review_repository.create_review(review, current_user)
         return created
     except ValueError as e:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.post("/bulk", response_model=List[ReviewBulkResultDTO])
+async def create_reviews_bulk(reviews: ReviewBulkCreate, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_REVIEW))]):
+
+    try:
+        return await review_repository.create_reviews_bulk(reviews, current_user)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @router.delete("/{review_id}", response_model=ReviewModel)
-async def delete_review(review_id: str, current_user: Annotated[User, Depends(get_current_user)]):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_DELETE_REVIEW not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+async def delete_review(review_id: str, current_user: Annotated[User, Depends(require_permission(c.PERMISSION_DELETE_REVIEW))]):
     
     try:
-        review = review_repository.delete_review(review_id)
+        review = await review_repository.delete_review(review_id)
         return review
     except ValueError as e:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
-@router.get("/exhibition/{exhibition_id}", response_model=List[ReviewModel])
+@router.get("/exhibition/{exhibition_id}", response_model=Page[ReviewModel])
 async def get_reviews_by_exhibition(
     exhibition_id: str,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_REVIEW))],
     entire_project: bool = False,
-    entire_user: bool = False
+    entire_user: bool = False,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
 ):
-    if not current_user:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
-    if not current_user.verified:
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
-    if c.PERMISSION_READ_REVIEW not in current_user.permissions:
-        raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
-        return review_repository.get_reviews_by_exhibition(
+        return await review_repository.get_reviews_by_exhibition(
             exhibition_id,
             entire_project,
-            entire_user
+            entire_user,
+            limit,
+            cursor
         )
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -94,7 +130,7 @@ async def get_reviews_by_user(project_id: Optional[str] = None, current_user: An
     if c.PERMISSION_READ_REVIEW not in current_user.permissions and current_user.project_id != project_id:
         raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Unauthorized")
 
-    reviews = review_repository.get_reviews_by_project(project_id)
+    reviews = await review_repository.get_reviews_by_project(project_id)
     if c.PERMISSION_READ_REVIEW in current_user.permissions:
         return reviews
     return [ReviewResume(
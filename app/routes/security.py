@@ -3,15 +3,22 @@ from fastapi.security import OAuth2PasswordBearer
 from typing import Annotated, Optional
 from pydantic import BaseModel
 from datetime import datetime, timezone, timedelta
+import hashlib
+import time
 import jwt
 from jwt.exceptions import InvalidTokenError
 import os
 
+from app.cache import TTLCache
+from app import constants as c
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login", auto_error=False)
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
 
 class User(BaseModel):
     id: str
@@ -21,7 +28,8 @@ class User(BaseModel):
         id: str
         name: str
     role: Role
-    permissions: list[str]
+    permissions: set[str]
+    perm_mask: int = 0
     verified: bool
 
 class Token(BaseModel):
@@ -30,27 +38,69 @@ class Token(BaseModel):
 
 def create_access_token(data: dict) -> Token:
     to_encode = data.copy()
+    # Permissions travel as a bitmask (see constants.PERMISSIONS) instead of a list of strings
+    if "permissions" in to_encode:
+        to_encode["perm_mask"] = c.encode_permissions(to_encode.pop("permissions") or [])
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return Token(access_token=encoded_jwt, token_type="bearer")
 
+# Decoded principals keyed by the SHA-256 of the token, so the raw token is never kept in memory.
+# Entries never outlive the token's own `exp`.
+_token_cache: TTLCache[User] = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS)
+
 async def get_current_user(token: Annotated[Optional[str], Depends(oauth2_scheme)] = None) -> Optional[User]:
     if not token:
         return None
+    token_digest = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _token_cache.get(token_digest)
+    if cached is not None:
+        # Routes may modify the principal (e.g. /users/verify), so each request gets its own copy
+        return cached.model_copy()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if email is None:
             return None
+        if "perm_mask" in payload:
+            perm_mask = payload["perm_mask"]
+            permissions = c.decode_permissions(perm_mask)
+        else:
+            # Tokens issued before the bitmask encoding carry the plain list
+            permissions = set(payload.get("permissions", []))
+            perm_mask = c.encode_permissions(permissions)
         user = User(
             id=payload.get("user_id"),
             project_id=payload.get("project_id"),
             email=email,
             role=payload.get("role"),
-            permissions=payload.get("permissions", []),
+            permissions=permissions,
+            perm_mask=perm_mask,
             verified=payload.get("verified")
         )
     except InvalidTokenError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        _token_cache.set(token_digest, user.model_copy(), ttl=expires_at - time.time())
     return user
+
+
+def require_permission(*permissions: str):
+    """
+    Dependency that resolves the current user and requires it to be verified and hold every given permission.
+    Usage: `current_user: Annotated[User, Depends(require_permission(c.PERMISSION_READ_USER))]`
+    """
+    required_mask = c.encode_permissions(permissions)
+
+    async def dependency(current_user: Annotated[Optional[User], Depends(get_current_user)]) -> User:
+        if not current_user:
+            raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
+        if not current_user.verified:
+            raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Email not verified")
+        if not c.has_permissions(current_user.perm_mask, required_mask):
+            raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
+        return current_user
+
+    return dependency
@@ -0,0 +1,56 @@
+from typing import Annotated
+from fastapi import APIRouter, HTTPException, status, Depends
+from app.routes.security import User, require_permission
+from app.dto.upload.upload_intent_dto import UploadIntentCreate, UploadIntentDTO
+from app.repository import upload_repository
+from app import constants as c
+
+router = APIRouter(
+    prefix="/uploads",
+    tags=["Uploads"]
+)
+
+TARGET_PERMISSIONS = {
+    "project_logo": c.PERMISSION_UPDATE_PROJECT,
+    "project_image": c.PERMISSION_UPDATE_PROJECT,
+    "user_profile_picture": c.PERMISSION_UPDATE_USER,
+    "exhibition_image": c.PERMISSION_UPDATE_EXHIBITION,
+}
+
+@router.post("", response_model=UploadIntentDTO, status_code=status.HTTP_201_CREATED)
+async def create_upload_intent(intent: UploadIntentCreate, current_user: Annotated[User, Depends(require_permission())]):
+    """
+    Reserve an object for a file and get a URL to PUT it to, straight to the bucket.
+    When `exists` is true the same file is already stored and can be finalized right away.
+    """
+    # The permission depends on the target in the body; require_permission() above checks the user is verified
+    await require_permission(TARGET_PERMISSIONS[intent.target])(current_user)
+    try:
+        return await upload_repository.create_intent(intent, current_user.id)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+    except RuntimeError as e:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, str(e))
+    except Exception as e:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
+
+@router.post("/{intent_id}/finalize", response_model=UploadIntentDTO)
+async def finalize_upload(intent_id: str, current_user: Annotated[User, Depends(require_permission())]):
+    """Attach the uploaded file to its project, user or exhibition. Resized variants follow shortly after."""
+    try:
+        return await upload_repository.finalize_intent(intent_id, current_user.id)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(e))
+    except Exception as e:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
+
+@router.get("/{intent_id}", response_model=UploadIntentDTO)
+async def get_upload_intent(intent_id: str, current_user: Annotated[User, Depends(require_permission())]):
+    intent = await upload_repository.get_intent(intent_id, current_user.id)
+    if intent is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Upload intent not found")
+    return intent
@@ -7,8 +7,13 @@ from pymongo.errors import DuplicateKeyError
 from app.repository import user_repository
 from typing import List, Annotated, Optional
 from app.model.user import UserModel
-from app.routes.security import get_current_user, create_access_token, User, Token
+from app.dto.pagination.page_dto import Page
+from app.dto.user.user_summary_dto import UserSummaryDTO
+from app.repository.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.routes.security import get_current_user, create_access_token, User, Token, require_permission
 from app.dto.user.user_create_dto import UserCreate
+from app.dto.user.user_import_dto import UserImportResultDTO
+from app.service.user_import import ImportFormat, detect_format, parse_users
 
 import app.constants as c
 
@@ -19,18 +24,23 @@ router = APIRouter(
     tags=["Users"]
 )
 
-@router.get("", response_model=List[UserModel])
+@router.get("", response_model=Page[UserSummaryDTO])
 async def list_users(
     current_user: Annotated[User, Depends(get_current_user)],
     name: Optional[str] = Query(None, description="Name of the user"),
-    role_id: Optional[str] = Query(None, description="Role ID of the user")
+    role_id: Optional[str] = Query(None, description="Role ID of the user"),
+    search: Optional[str] = Query(None, description="Full-text search with relevance ordering (uses the text index)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
 ):
     if not current_user:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
     if c.PERMISSION_READ_USER not in current_user.permissions:
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
-        return user_repository.list_all_users(name, role_id)
+        return await user_repository.list_all_users(name, role_id, limit, cursor, search)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -41,7 +51,7 @@ async def get_user(user_id: str, current_user: Annotated[User, Depends(get_curre
     if c.PERMISSION_READ_USER not in current_user.permissions and user_id != current_user.id:
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
     try:
-        user = user_repository.get_user_by_id(user_id)
+        user = await user_repository.get_user_by_id(user_id)
         if user is None:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
         return user
@@ -83,6 +93,23 @@ async def create_user(
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Not able to create user: {str(e)}")
 
+@router.post("/import", response_model=List[UserImportResultDTO])
+async def import_users(
+    current_user: Annotated[User, Depends(require_permission(c.PERMISSION_CREATE_USER))],
+    file: UploadFile = File(..., description="CSV with a header of user fields, or a JSON list of users"),
+    format: Optional[ImportFormat] = Query(None, description="File format (default: inferred from the file name)")
+):
+
+    try:
+        rows = parse_users(await file.read(), format or detect_format(file.filename or ""))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=f"Invalid import file: {str(e)}")
+
+    try:
+        return await user_repository.import_users(rows, current_user.permissions)
+    except Exception as e:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, f"Not able to import users: {str(e)}")
+
 @router.put("/{user_id}", response_model=UserModel)
 async def update_user(
         user_id: str,
@@ -155,7 +182,7 @@ async def favorite_project(project_id: str, current_user: Annotated[User, Depend
     if not current_user:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Unauthorized")
     try:
-        return user_repository.favorite_project(current_user.id, project_id)
+        return await user_repository.favorite_project(current_user.id, project_id)
     except Exception as e:
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
@@ -164,7 +191,7 @@ async def favorite_project(project_id: str, current_user: Annotated[User, Depend
 async def delete_user(user_id: str, current_user: Annotated[User, Depends(get_current_user)]):
     if c.PERMISSION_DELETE_USER not in current_user.permissions:
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Insufficient permissions")
-    success = user_repository.delete_user(user_id)
+    success = await user_repository.delete_user(user_id)
     if not success:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
     return {"message": "User deleted successfully"}
@@ -178,7 +205,7 @@ async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]
 
 @router.post("/login", response_model=Token)
 async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
-    user = user_repository.authenticate_user(form_data.username, form_data.password)
+    user = await user_repository.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status.HTTP_401_UNAUTHORIZED,
@@ -210,7 +237,7 @@ async def verify_user(current_user: Annotated[User, Depends(get_current_user)]):
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "User already verified")
     # Update verified status
     current_user.verified = True
-    updated_user = user_repository.update_user(current_user.id, current_user)
+    updated_user = await user_repository.update_user(current_user.id, current_user)
     # Generate new access token
     token = create_access_token(data={
         "sub": updated_user.email,
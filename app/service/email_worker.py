@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from smtplib import SMTP, SMTPException, SMTPServerDisconnected
+from typing import Any, Optional
+
+from app.repository import email_queue_repository
+from app.service.sendEmail import EXPO_APP_PASSWORD, EXPO_EMAIL, HOST_SMTP, PORTA_SMTP
+
+logger = logging.getLogger(__name__)
+
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_POLL_INTERVAL_SECONDS = float(os.getenv("EMAIL_POLL_INTERVAL_SECONDS", "2"))
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+# Sessions idle for longer are closed; most servers drop them after a few minutes anyway
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+
+class SMTPSession:
+    """
+    One SMTP connection reused across messages: connect, STARTTLS and login happen once
+    instead of per email. Not thread-safe; the worker drives it from a single thread.
+    """
+
+    def __init__(self):
+        self._smtp: Optional[SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> SMTP:
+        logger.info(f"[SEND_EMAIL] Conectando ao servidor SMTP - Host: {HOST_SMTP}:{PORTA_SMTP}")
+        smtp = SMTP(host=HOST_SMTP, port=PORTA_SMTP, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if EXPO_APP_PASSWORD:
+                smtp.login(EXPO_EMAIL, EXPO_APP_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except SMTPException:
+                self._smtp.close()
+            except OSError:
+                pass
+            self._smtp = None
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self.close()
+
+    def send(self, message: EmailMessage) -> None:
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(message)
+        except SMTPServerDisconnected:
+            # The server dropped the idle session: reconnect once and retry
+            self._smtp = self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+def _build_message(email: dict[str, Any]) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = email["subject"]
+    message["From"] = EXPO_EMAIL
+    message["To"] = email["to"]
+    message.add_alternative(email["html"], subtype="html", charset="utf-8")
+    return message
+
+def _send(session: SMTPSession, email: dict[str, Any]) -> Optional[str]:
+    """Send one email over the shared session; returns the error, or None when sent."""
+    try:
+        session.send(_build_message(email))
+        return None
+    except (SMTPException, OSError) as e:
+        # Start the next message on a fresh connection
+        session.close()
+        return f"{type(e).__name__}: {e}"
+
+async def process_batch(session: SMTPSession, executor: ThreadPoolExecutor) -> int:
+    """Claim and send one batch of emails. Returns how many emails were claimed."""
+    emails = await email_queue_repository.claim_batch(EMAIL_BATCH_SIZE)
+    if not emails:
+        return 0
+    loop = asyncio.get_running_loop()
+
+    # A whole batch can outlast the lease (EMAIL_BATCH_SIZE x SMTP_TIMEOUT_SECONDS), so the lease
+    # is renewed before each message and each one is recorded as soon as it is sent. A message
+    # whose lease expired may already be with another instance and is skipped.
+    sent = 0
+    for email in emails:
+        if not await email_queue_repository.renew_lease(email):
+            logger.warning(f"[SEND_EMAIL] Email {email['_id']} foi retomado por outra instância")
+            continue
+        error = await loop.run_in_executor(executor, _send, session, email)
+        if error is None:
+            await email_queue_repository.mark_sent([email["_id"]])
+            sent += 1
+        else:
+            logger.error(f"[SEND_EMAIL] Falha ao enviar email {email['_id']} - Destinatário: {email['to']}: {error}")
+            await email_queue_repository.mark_failed(email, error)
+    logger.info(f"[SEND_EMAIL] Lote enviado - {sent} de {len(emails)} emails")
+    return len(emails)
+
+async def run() -> None:
+    """Deliver queued emails until cancelled."""
+    session = SMTPSession()
+    # smtplib blocks, so the session lives on its own thread
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                claimed = await process_batch(session, executor)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[SEND_EMAIL] Erro no envio do lote: {type(e).__name__}: {e}")
+                claimed = 0
+            if claimed < EMAIL_BATCH_SIZE:
+                await loop.run_in_executor(executor, session.close_if_idle)
+                await asyncio.sleep(EMAIL_POLL_INTERVAL_SECONDS)
+    finally:
+        executor.submit(session.close)
+        executor.shutdown(wait=False)
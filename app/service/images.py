@@ -0,0 +1,63 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# Longest edge in pixels of each variant; images smaller than a variant are not upscaled.
+# The names are part of the blob paths (see app.bucket.variant_blob_name).
+VARIANT_SIZES = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1600,
+}
+VARIANT_FORMAT = "WEBP"
+VARIANT_CONTENT_TYPE = "image/webp"
+VARIANT_EXTENSION = "webp"
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", str(os.cpu_count() or 1)))
+
+# Decoding and resizing is CPU-bound and holds the GIL for most of the work, so it runs in
+# worker processes; each upload is decoded once there and all variants are cut from that.
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS)
+    return _process_pool
+
+def _render_variants(data: bytes, quality: int) -> dict[str, bytes]:
+    # Pillow is only needed in the worker processes
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            # Phone photos are stored sideways with an EXIF rotation flag
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return {}
+
+    variants: dict[str, bytes] = {}
+    # Largest first, so each smaller variant is resampled from fewer pixels
+    for name, size in sorted(VARIANT_SIZES.items(), key=lambda item: item[1], reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, VARIANT_FORMAT, quality=quality, method=4)
+        variants[name] = output.getvalue()
+    return variants
+
+async def render_variants(data: bytes) -> dict[str, bytes]:
+    """
+    Resize an uploaded image into every variant in VARIANT_SIZES, encoded as WebP.
+    Returns an empty dict when the data is not a raster image Pillow can decode (e.g. SVG).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_process_pool(), _render_variants, data, IMAGE_VARIANT_QUALITY)
+
+def shutdown() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable
+
+from app.model.role import RoleModel
+from app.repository import (
+    exhibition_repository,
+    outbox_repository,
+    project_repository,
+    review_repository,
+    roles_repository,
+    upload_repository,
+    user_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1"))
+
+async def _propagate_user(user_id: str) -> dict[str, Any]:
+    # Always copies the user as it is now, so replaying or coalescing events is harmless
+    user = await user_repository.get_user_by_id(user_id)
+    if user is None:
+        return {"skipped": "user not found"}
+    return {
+        "projects": await project_repository.update_project_with_user(user_id, user),
+        "reviews": await review_repository.update_reviews_with_user(user_id, user),
+    }
+
+async def _propagate_role(role_id: str) -> dict[str, Any]:
+    role_data = await roles_repository.roles_collection.find_one({"_id": role_id})
+    if role_data is None:
+        return {"skipped": "role not found"}
+    role = RoleModel(**role_data)
+    return {
+        "users": await user_repository.update_users_with_role(role_id, role),
+        "exhibitions": await exhibition_repository.update_exhibion_with_role(role_id, role),
+        "reviews": await review_repository.update_reviews_with_role(role_id, role),
+    }
+
+HANDLERS: dict[str, Callable[[str], Awaitable[dict[str, Any]]]] = {
+    outbox_repository.KIND_USER_UPDATED: _propagate_user,
+    outbox_repository.KIND_ROLE_UPDATED: _propagate_role,
+    outbox_repository.KIND_UPLOAD_FINALIZED: upload_repository.apply_variants,
+}
+
+async def process_batch() -> int:
+    """Claim and apply one batch of events. Returns how many events were claimed."""
+    events = await outbox_repository.claim_batch(OUTBOX_BATCH_SIZE)
+
+    # Several edits of the same user or role in one batch need a single propagation
+    grouped: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for event in events:
+        grouped.setdefault((event["kind"], event["key"]), []).append(event)
+
+    for (kind, key), group in grouped.items():
+        event_ids = [event["_id"] for event in group]
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            for event in group:
+                await outbox_repository.mark_failed({**event, "attempts": outbox_repository.OUTBOX_MAX_ATTEMPTS}, f"Unknown event kind {kind}")
+            continue
+        try:
+            result = await handler(key)
+        except Exception as e:
+            logger.warning(f"[OUTBOX] {kind} {key} failed: {e}")
+            for event in group:
+                await outbox_repository.mark_failed(event, str(e))
+            continue
+        await outbox_repository.mark_done(event_ids, result)
+    return len(events)
+
+async def run() -> None:
+    """Poll the outbox until cancelled. Full batches are followed immediately by the next one."""
+    while True:
+        try:
+            claimed = await process_batch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[OUTBOX] Batch failed: {e}")
+            claimed = 0
+        if claimed < OUTBOX_BATCH_SIZE:
+            await asyncio.sleep(OUTBOX_POLL_INTERVAL_SECONDS)
@@ -0,0 +1,69 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+# Cost factor for new hashes. Hashes made with another cost are upgraded on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Upper bound on bcrypt operations running at once for login and user creation.
+# Extra requests wait for a free worker instead of piling CPU work onto the event loop.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# bcrypt releases the GIL while hashing, so single operations run on threads (no pickling
+# or process start-up on the request path); large batches are spread over one process per core.
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def _hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> bytes:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds))
+
+def _check_password(password: str, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed)
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _thread_pool
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _process_pool
+
+def hash_rounds(hashed: bytes) -> int:
+    # Modular crypt format: $2b$<cost>$<salt+hash>
+    return int(hashed.split(b"$")[2])
+
+def needs_rehash(hashed: bytes) -> bool:
+    return hash_rounds(hashed) != BCRYPT_ROUNDS
+
+async def hash_password(password: str) -> bytes:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_thread_pool(), _hash_password, password)
+
+async def verify_password(password: str, hashed: bytes) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_thread_pool(), _check_password, password, hashed)
+
+async def hash_passwords(passwords: list[str]) -> list[bytes]:
+    """Hash a batch of passwords in parallel across all cores, keeping the input order."""
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    pool = _get_process_pool()
+    return list(await asyncio.gather(
+        *(loop.run_in_executor(pool, _hash_password, password, BCRYPT_ROUNDS) for password in passwords)
+    ))
+
+def shutdown() -> None:
+    global _thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(cancel_futures=True)
+        _thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
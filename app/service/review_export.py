@@ -0,0 +1,48 @@
+import csv
+import io
+from typing import Any, AsyncIterator
+
+from app.dto.review.review_resume_dto import ReviewResume
+from app.model.review import ReviewModel
+
+CSV_HEADER = ["review_id", "project_id", "project_name", "criterion", "score", "weight", "role_weight"]
+# Same fields as ReviewResume, without the reviewer's role weight
+RESUME_CSV_HEADER = ["review_id", "project_id", "criterion", "score", "weight"]
+
+async def ndjson_lines(reviews: AsyncIterator[dict[str, Any]], resume_only: bool = False) -> AsyncIterator[str]:
+    """One JSON document per line, serialized as each review comes off the cursor."""
+    async for review in reviews:
+        if resume_only:
+            line = ReviewResume(
+                id=review["_id"],
+                grades=[ReviewResume.Grade(**grade) for grade in review.get("grades", [])],
+                project_id=review["project"]["_id"]
+            ).model_dump_json()
+        else:
+            line = ReviewModel(**review).model_dump_json(by_alias=True)
+        yield line + "\n"
+
+def _csv_row(values: list[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+async def csv_lines(reviews: AsyncIterator[dict[str, Any]], resume_only: bool = False) -> AsyncIterator[str]:
+    """Flattened rows, one per (review, criterion)."""
+    yield _csv_row(RESUME_CSV_HEADER if resume_only else CSV_HEADER)
+    async for review in reviews:
+        project = review.get("project", {})
+        role_weight = review.get("user", {}).get("role", {}).get("weight")
+        for grade in review.get("grades", []):
+            if resume_only:
+                yield _csv_row([review["_id"], project.get("_id"), grade.get("name"), grade.get("score"), grade.get("weight")])
+                continue
+            yield _csv_row([
+                review["_id"],
+                project.get("_id"),
+                project.get("name"),
+                grade.get("name"),
+                grade.get("score"),
+                grade.get("weight"),
+                role_weight,
+            ])
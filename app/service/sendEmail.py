@@ -1,8 +1,7 @@
 import os
 import logging
-from datetime import datetime
-from email.message import EmailMessage
-from smtplib import SMTP, SMTPException
+
+from app.repository import email_queue_repository
 
 logger = logging.getLogger(__name__)
 
@@ -12,30 +11,29 @@ EXPO_FRONT_URL = os.getenv("EXPO_FRONT_URL", "")
 HOST_SMTP = os.getenv("HOST_SMTP", "")
 PORTA_SMTP = int(os.getenv("PORTA_SMTP", "0"))
 
-def send_login_token_email(
+async def send_login_token_email(
     user_email: str,
     user_name: str,
     token: str,
-) -> bool:
+) -> str:
+    """
+    Queue the welcome email and return its id. Delivery (SMTP session, retries,
+    delivery state) is handled by app.service.email_worker.
+    """
     logger.info(f"[SEND_EMAIL] Iniciando envio de email - Destinatário: {user_email}")
     
     if not EXPO_EMAIL:
         logger.error("[SEND_EMAIL] EXPO_EMAIL não configurado")
         raise RuntimeError("EXPO_EMAIL não configurado")
     
-    if not EXPO_APP_PASSWORD:
-        logger.error("[SEND_EMAIL] EXPO_APP_PASSWORD não configurado")
-        raise RuntimeError("EXPO_APP_PASSWORD não configurado")
-    
     if not EXPO_FRONT_URL:
         logger.error("[SEND_EMAIL] EXPO_FRONT_URL não configurado")
         raise RuntimeError("EXPO_FRONT_URL não configurado")
     
-    try:
-        logger.info(f"[SEND_EMAIL] Preparando mensagem de email - Destinatário: {user_email}")
-        assunto = "Bem-vindo a ExpoTech!"
+    logger.info(f"[SEND_EMAIL] Preparando mensagem de email - Destinatário: {user_email}")
+    assunto = "Bem-vindo a ExpoTech!"
 
-        corpo_email = f"""<!DOCTYPE html>
+    corpo_email = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -98,30 +96,6 @@ def send_login_token_email(
 </body>
 </html>"""
 
-        msg = EmailMessage()
-        msg["Subject"] = assunto
-        msg["From"] = EXPO_EMAIL
-        msg["To"] = user_email
-        msg.add_alternative(corpo_email, subtype="html", charset="utf-8")
-
-        logger.info(f"[SEND_EMAIL] Conectando ao servidor SMTP - Host: {HOST_SMTP}:{PORTA_SMTP}")
-        smtp_start = datetime.now()
-        with SMTP(host=HOST_SMTP, port=PORTA_SMTP, timeout=100) as smtp:
-            logger.info("[SEND_EMAIL] Iniciando TLS...")
-            smtp.starttls()
-            logger.info("[SEND_EMAIL] Fazendo login no SMTP...")
-            smtp.login(EXPO_EMAIL, EXPO_APP_PASSWORD)
-            logger.info("[SEND_EMAIL] Enviando mensagem...")
-            smtp.send_message(msg)
-        
-        smtp_duration = (datetime.now() - smtp_start).total_seconds()
-        logger.info(f"[SEND_EMAIL] Email enviado com sucesso em {smtp_duration:.2f}s - Destinatário: {user_email}")
-
-        return True
-    except SMTPException as e:
-        logger.error(f"[SEND_EMAIL] Erro SMTP: {str(e)}")
-        raise RuntimeError(f"Erro ao enviar email: {str(e)}")
-    except Exception as e:
-        logger.error(f"[SEND_EMAIL] Erro inesperado: {type(e).__name__}: {str(e)}", exc_info=True)
-        raise RuntimeError(f"Erro ao enviar email: {type(e).__name__}: {str(e)}")
-        
\ No newline at end of file
+    email_id = await email_queue_repository.enqueue_email(user_email, assunto, corpo_email)
+    logger.info(f"[SEND_EMAIL] Email enfileirado - Id: {email_id} - Destinatário: {user_email}")
+    return email_id
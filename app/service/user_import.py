@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+from typing import Any, Literal
+
+ImportFormat = Literal["csv", "json"]
+
+def detect_format(filename: str) -> ImportFormat:
+    return "json" if filename.lower().endswith(".json") else "csv"
+
+def parse_users(content: bytes, format: ImportFormat) -> list[dict[str, Any]]:
+    """
+    Read the rows of a user import file. CSV files use the UserCreate field names as header
+    (empty cells are treated as missing); JSON files hold a list of UserCreate objects.
+    """
+    text = content.decode("utf-8-sig")
+    if format == "json":
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be a list of users")
+        return rows
+    return [
+        {key: value for key, value in row.items() if key and value not in ("", None)}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+async def _import(path: str) -> int:
+    # Imported lazily so `--help` works without a database configuration
+    from app.repository import user_repository
+    from app.service import passwords
+
+    with open(path, "rb") as file:
+        rows = parse_users(file.read(), detect_format(path))
+    try:
+        results = await user_repository.import_users(rows, None)
+    finally:
+        passwords.shutdown()
+
+    for result in results:
+        if result.status != "created":
+            print(f"row {result.row} ({result.email}): {result.status} - {result.detail}")
+    created = sum(1 for result in results if result.status == "created")
+    print(f"Imported {created} of {len(results)} users")
+    return 0 if created == len(results) else 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV or JSON file.")
+    parser.add_argument('path', type=str, help='CSV (header with UserCreate fields) or JSON (list of users) file')
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_import(args.path)))
+
+if __name__ == '__main__':
+    main()
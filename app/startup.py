@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable
+
+from app import bucket
+from app.database import client, ping
+from app.indexes import ensure_indexes
+from app.repository import roles_repository
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for each initialization step, so a blue/green swap fails fast instead of hanging
+STARTUP_TIMEOUT_SECONDS = float(os.getenv("STARTUP_TIMEOUT_SECONDS", "15"))
+
+async def _step(name: str, awaitable: Awaitable[Any], timings: dict[str, float], required: bool = True) -> Any:
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(awaitable, timeout=STARTUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        message = f"Startup step '{name}' timed out after {STARTUP_TIMEOUT_SECONDS:g}s"
+        if required:
+            raise RuntimeError(message)
+        logger.warning(f"[STARTUP] {message}")
+    finally:
+        timings[name] = time.perf_counter() - start
+
+async def initialize() -> dict[str, float]:
+    """
+    Connect to Mongo and GCS, create the indexes and seed the default role, all concurrently.
+    Nothing of this runs at import time. Returns the seconds each step took.
+    """
+    timings: dict[str, float] = {}
+    await asyncio.gather(
+        # The connection checks only report problems, as they did when they ran at import time
+        _step("mongo", ping(), timings, required=False),
+        _step("indexes", ensure_indexes(), timings),
+        _step("default_role", roles_repository.ensure_default_role(), timings),
+        _step("gcs", bucket.connect(), timings, required=False),
+    )
+    logger.info("[STARTUP] " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items()))
+    return timings
+
+async def shutdown() -> None:
+    # An open client keeps its monitor tasks alive and stalls the event loop shutdown
+    await client.close()
@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import os
+import time
+
+# app.routes.security reads its settings at import time
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+from app.routes import security  # noqa: E402
+
+
+def _token() -> str:
+    return security.create_access_token(data={
+        "sub": "bench@example.com",
+        "user_id": "bench-user",
+        "project_id": None,
+        "scope": "",
+        "permissions": ["read_user", "read_project", "create_review", "read_review"],
+        "role": {"id": "default", "name": "guest"},
+        "verified": True
+    }).access_token
+
+
+async def _measure(token: str, iterations: int, cached: bool) -> float:
+    security._token_cache.clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            security._token_cache.clear()
+        await security.get_current_user(token)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-request cost of resolving the bearer token in get_current_user.")
+    parser.add_argument('--iterations', type=int, default=100_000, help='Calls per measurement')
+    args = parser.parse_args()
+
+    token = _token()
+    uncached = asyncio.run(_measure(token, args.iterations, cached=False))
+    cached = asyncio.run(_measure(token, args.iterations, cached=True))
+    print(f"decode every request: {uncached:8.2f} us/request")
+    print(f"token cache hit:      {cached:8.2f} us/request ({uncached / cached:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _request(url: str, token: str | None) -> float:
+    request = urllib.request.Request(url)
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=60) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def run_level(url: str, token: str | None, concurrency: int, requests: int) -> dict:
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda _: _request(url, token), range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how many concurrent requests a single uvicorn worker sustains. "
+                    "Start the API with `uvicorn app.main:app --workers 1` and run this script "
+                    "against both the old and the new build to compare."
+    )
+    parser.add_argument('--url', type=str, default='http://localhost:8000/exhibitions/current/', help='Endpoint to hit (default: current exhibition)')
+    parser.add_argument('--token', type=str, default=None, help='Bearer token used on every request')
+    parser.add_argument('--levels', type=str, default='1,8,32,64,128', help='Comma separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=500, help='Requests sent per concurrency level')
+    parser.add_argument('--slo-ms', type=float, default=500.0, help='p95 latency budget used to report the sustainable concurrency')
+    args = parser.parse_args()
+
+    sustainable = 0
+    print(f"{'concurrency':>12} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for level in (int(value) for value in args.levels.split(',')):
+        result = run_level(args.url, args.token, level, args.requests)
+        print(f"{result['concurrency']:>12} {result['rps']:>10.1f} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f}")
+        if result["p95_ms"] <= args.slo_ms:
+            sustainable = level
+
+    print(f"Highest concurrency within p95 <= {args.slo_ms:.0f}ms: {sustainable}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _login(url: str, email: str, password: str) -> float:
+    body = urllib.parse.urlencode({"username": email, "password": password}).encode()
+    request = urllib.request.Request(url, data=body, method="POST")
+    request.add_header("Content-Type", "application/x-www-form-urlencoded")
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=60) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def _probe(url: str, stop: threading.Event, latencies: list[float]) -> None:
+    # A cheap request sent back to back while the logins run: if bcrypt blocks the
+    # event loop its latency grows with the login concurrency.
+    while not stop.is_set():
+        start = time.perf_counter()
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+        latencies.append(time.perf_counter() - start)
+
+
+def _p95(latencies: list[float]) -> float:
+    latencies = sorted(latencies)
+    return latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000
+
+
+def run_level(base_url: str, email: str, password: str, probe_path: str, concurrency: int, requests: int) -> dict:
+    stop = threading.Event()
+    probe_latencies: list[float] = []
+    probe = threading.Thread(target=_probe, args=(base_url + probe_path, stop, probe_latencies))
+    probe.start()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(lambda _: _login(base_url + "/users/login", email, password), range(requests)))
+            elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        probe.join()
+
+    return {
+        "concurrency": concurrency,
+        "logins_per_s": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": _p95(latencies),
+        "probe_p95_ms": _p95(probe_latencies) if probe_latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure login throughput and how much a burst of logins slows down other requests. "
+                    "Start the API with `uvicorn app.main:app --workers 1`, create a verified user and "
+                    "run this script against both the old and the new build to compare."
+    )
+    parser.add_argument('--url', type=str, default='http://localhost:8000', help='API base URL')
+    parser.add_argument('--email', type=str, required=True, help='Login of an existing verified user')
+    parser.add_argument('--password', type=str, required=True, help='Password of that user')
+    parser.add_argument('--probe-path', type=str, default='/exhibitions/current/', help='Endpoint timed while the logins run')
+    parser.add_argument('--levels', type=str, default='1,8,32,64', help='Comma separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=200, help='Logins sent per concurrency level')
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    print(f"{'concurrency':>12} {'logins/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'probe p95':>10}")
+    for level in (int(value) for value in args.levels.split(',')):
+        result = run_level(base_url, args.email, args.password, args.probe_path, level, args.requests)
+        print(
+            f"{result['concurrency']:>12} {result['logins_per_s']:>10.1f} {result['p50_ms']:>10.1f} "
+            f"{result['p95_ms']:>10.1f} {result['probe_p95_ms']:>10.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
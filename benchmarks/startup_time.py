@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+# Each import runs in a fresh interpreter, so nothing is already in sys.modules
+_IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(int(any(name.startswith("google.cloud") for name in sys.modules)))
+"""
+
+
+def _import_time(module: str) -> tuple[float, bool]:
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[-2]), output[-1] == "1"
+
+
+async def _startup() -> dict[str, float]:
+    # Through app.main, which imports the repositories in the order the server does
+    from app.main import startup
+    try:
+        return await startup.initialize()
+    finally:
+        await startup.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long importing the app and running its startup take.")
+    parser.add_argument('--module', default='app.main', help='Module to import')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time the import in')
+    parser.add_argument('--skip-startup', action='store_true', help='Only time the import (no Mongo or GCS needed)')
+    args = parser.parse_args()
+
+    results = [_import_time(args.module) for _ in range(args.runs)]
+    times = [seconds for seconds, _ in results]
+    print(f"import {args.module}: median {statistics.median(times) * 1000:8.1f} ms, "
+          f"min {min(times) * 1000:8.1f} ms over {args.runs} runs")
+    print(f"google.cloud loaded at import: {'yes' if results[0][1] else 'no'}")
+
+    if args.skip_startup:
+        return
+    start = time.perf_counter()
+    timings = asyncio.run(_startup())
+    print(f"startup: {(time.perf_counter() - start) * 1000:8.1f} ms")
+    for name, seconds in timings.items():
+        print(f"  {name:<14} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
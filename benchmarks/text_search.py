@@ -0,0 +1,128 @@
+import argparse
+import itertools
+import os
+import random
+import statistics
+import time
+import uuid
+
+from pymongo import TEXT, IndexModel, MongoClient
+
+# Same definition as the "projects" text index in app/indexes.py. That module is not imported
+# because it pulls in app.database, which needs MONGODB_URI and opens the server's client.
+TEXT_INDEX = IndexModel(
+    [("name", TEXT), ("company_name", TEXT), ("description", TEXT)],
+    weights={"name": 10, "company_name": 5, "description": 1},
+    default_language="portuguese",
+)
+
+# Frequent domain words, followed by a long tail of generated ones
+HEAD_WORDS = [
+    "agro", "saude", "logistica", "energia", "solar", "agua", "reciclagem", "frota", "estoque", "alimento",
+    "nutricao", "escola", "cidade", "mobilidade", "sensor", "dados", "inteligencia", "gestao", "industria",
+    "varejo", "financas", "credito", "clima", "floresta", "transporte", "caminhao", "tempo", "fabrica",
+    "sustentavel", "embalagem", "contabilidade", "scanner", "aplicativo", "plataforma", "monitoramento",
+]
+SYLLABLES = ["ba", "ca", "da", "fe", "ge", "li", "ma", "no", "pa", "ri", "sa", "to", "vi", "ze", "lu", "mor", "tan", "ver"]
+VOCABULARY_SIZE = 20_000
+# Planted in a handful of projects, to time a selective search next to the frequent ones
+RARE_TERM = "quimiluminescencia"
+RARE_DOCUMENTS = 20
+
+
+def vocabulary(size: int) -> list[str]:
+    tail = ("".join(parts) for length in (3, 4, 5) for parts in itertools.product(SYLLABLES, repeat=length))
+    return (HEAD_WORDS + [word for word in tail if word not in HEAD_WORDS])[:size]
+
+
+def zipf_weights(size: int, exponent: float = 1.07) -> list[float]:
+    # Cumulative weights, so random.choices does not rebuild them on every call
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def seed(collection, count: int, words: list[str]) -> None:
+    collection.drop()
+    weights = zipf_weights(len(words))
+
+    def text(length: int) -> str:
+        return " ".join(random.choices(words, cum_weights=weights, k=length))
+
+    rare = set(random.sample(range(count), min(RARE_DOCUMENTS, count)))
+    batch = []
+    for index in range(count):
+        description = text(random.randint(20, 120))
+        if index in rare:
+            description = f"{description} {RARE_TERM}"
+        batch.append({
+            "_id": str(uuid.uuid4()),
+            "name": text(random.randint(1, 4)).upper(),
+            "company_name": text(random.randint(1, 2)).capitalize(),
+            "description": description,
+            "exhibition_id": "bench",
+            "expositors": [],
+        })
+        if len(batch) == 1000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    collection.create_indexes([TEXT_INDEX])
+
+
+def timed(run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare $regex filters with the text index on a seeded projects collection.")
+    parser.add_argument('--mongo-url', type=str, default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"), help='MongoDB connection URL')
+    parser.add_argument('--db', type=str, default='expotech_bench', help='Scratch database, dropped at the end (default: expotech_bench)')
+    parser.add_argument('--documents', type=int, default=100_000, help='Number of projects to seed')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per query, the median is reported')
+    parser.add_argument('--limit', type=int, default=50, help='Page size used by both queries')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated projects')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch database')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    words = vocabulary(VOCABULARY_SIZE)
+    client = MongoClient(args.mongo_url)
+    collection = client[args.db]["projects"]
+    print(f"Seeding {args.documents} projects into '{args.db}.projects'...")
+    seed(collection, args.documents, words)
+
+    # A frequent, a mid-frequency and a tail word by Zipf rank, plus the planted rare one.
+    # A page of a frequent term returns early on a scan; counting has to visit every match.
+    terms = [("frequent", words[0]), ("mid", words[200]), ("tail", words[5000]), ("rare", RARE_TERM)]
+    print(f"{'':>8} {'term':>20} {'regex hits':>11} {'text hits':>10} "
+          f"{'regex page ms':>14} {'text page ms':>13} {'regex count ms':>15} {'text count ms':>14}")
+    for label, term in terms:
+        regex_filter = {"$or": [
+            {"name": {"$regex": term, "$options": "i"}},
+            {"company_name": {"$regex": term, "$options": "i"}},
+            {"description": {"$regex": term, "$options": "i"}},
+        ]}
+        text_filter = {"$text": {"$search": term}}
+        regex_page = timed(lambda: list(collection.find(regex_filter).limit(args.limit)), args.repeat)
+        text_page = timed(lambda: list(collection.find(
+            text_filter,
+            {"score": {"$meta": "textScore"}},
+        ).sort([("score", {"$meta": "textScore"})]).limit(args.limit)), args.repeat)
+        regex_count = timed(lambda: collection.count_documents(regex_filter), args.repeat)
+        text_count = timed(lambda: collection.count_documents(text_filter), args.repeat)
+        print(f"{label:>8} {term:>20} {collection.count_documents(regex_filter):>11} "
+              f"{collection.count_documents(text_filter):>10} {regex_page:>14.2f} {text_page:>13.2f} "
+              f"{regex_count:>15.2f} {text_count:>14.2f}")
+
+    if not args.keep:
+        client.drop_database(args.db)
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
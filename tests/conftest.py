@@ -0,0 +1,5 @@
+import os
+
+# app.database reads the URI at import time; the client it creates connects lazily,
+# so tests that never query Mongo do not need a server
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
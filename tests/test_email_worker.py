@@ -0,0 +1,148 @@
+import asyncio
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.service import email_worker
+
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps delivered messages and refuses `reject@` recipients."""
+
+    def __init__(self):
+        self.envelopes = []
+        self.peers = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("reject@"):
+            return "550 5.1.1 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append(envelope)
+        self.peers.append(session.peer)
+        return "250 Message accepted"
+
+
+class FakeQueue:
+    """In-memory stand-in for app.repository.email_queue_repository."""
+
+    def __init__(self, emails, lost_leases=()):
+        self.emails = emails
+        self.lost_leases = set(lost_leases)
+        self.renewed = []
+        self.sent = []
+        self.failed = {}
+
+    async def claim_batch(self, limit):
+        return self.emails[:limit]
+
+    async def renew_lease(self, email):
+        self.renewed.append(email["_id"])
+        return email["_id"] not in self.lost_leases
+
+    async def mark_sent(self, email_ids):
+        self.sent.extend(email_ids)
+
+    async def mark_failed(self, email, error):
+        self.failed[email["_id"]] = error
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _email(email_id: str, to: str) -> dict:
+    return {"_id": email_id, "claim": "claim", "to": to, "subject": f"Assunto {email_id}", "html": "<p>Olá</p>"}
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setattr(email_worker, "HOST_SMTP", controller.hostname)
+    monkeypatch.setattr(email_worker, "PORTA_SMTP", controller.port)
+    monkeypatch.setattr(email_worker, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(email_worker, "EXPO_APP_PASSWORD", "")
+    monkeypatch.setattr(email_worker, "EXPO_EMAIL", "expotech@example.com")
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def session():
+    session = email_worker.SMTPSession()
+    yield session
+    session.close()
+
+
+def _process_batch(queue: FakeQueue, session: email_worker.SMTPSession, monkeypatch) -> int:
+    for name in ("claim_batch", "renew_lease", "mark_sent", "mark_failed"):
+        monkeypatch.setattr(email_worker.email_queue_repository, name, getattr(queue, name))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return asyncio.run(email_worker.process_batch(session, executor))
+
+
+def test_session_reuses_one_connection(smtp_server, session):
+    for index in range(3):
+        session.send(email_worker._build_message(_email(str(index), f"user{index}@example.com")))
+
+    assert [envelope.rcpt_tos for envelope in smtp_server.envelopes] == [
+        ["user0@example.com"], ["user1@example.com"], ["user2@example.com"]
+    ]
+    assert len(set(smtp_server.peers)) == 1
+
+
+def test_session_reconnects_after_disconnect(smtp_server, session):
+    session.send(email_worker._build_message(_email("1", "user@example.com")))
+    # Simulates the server dropping the idle session
+    session._smtp.close()
+    session.send(email_worker._build_message(_email("2", "user@example.com")))
+
+    assert len(smtp_server.envelopes) == 2
+    assert len(set(smtp_server.peers)) == 2
+
+
+def test_process_batch_records_each_delivery(smtp_server, session, monkeypatch):
+    queue = FakeQueue([
+        _email("a", "one@example.com"),
+        _email("b", "reject@example.com"),
+        _email("c", "two@example.com"),
+    ])
+
+    assert _process_batch(queue, session, monkeypatch) == 3
+    assert queue.renewed == ["a", "b", "c"]
+    assert queue.sent == ["a", "c"]
+    assert list(queue.failed) == ["b"]
+    assert "SMTPRecipientsRefused" in queue.failed["b"]
+    assert [envelope.rcpt_tos for envelope in smtp_server.envelopes] == [["one@example.com"], ["two@example.com"]]
+    message = smtp_server.envelopes[0].original_content.decode()
+    assert "Subject: Assunto a" in message and "From: expotech@example.com" in message
+
+
+def test_process_batch_skips_emails_whose_lease_was_lost(smtp_server, session, monkeypatch):
+    queue = FakeQueue([_email("a", "one@example.com"), _email("b", "two@example.com")], lost_leases={"a"})
+
+    _process_batch(queue, session, monkeypatch)
+
+    assert queue.sent == ["b"]
+    assert queue.failed == {}
+    assert [envelope.rcpt_tos for envelope in smtp_server.envelopes] == [["two@example.com"]]
+
+
+def test_process_batch_retries_later_when_server_is_down(session, monkeypatch):
+    monkeypatch.setattr(email_worker, "HOST_SMTP", "127.0.0.1")
+    monkeypatch.setattr(email_worker, "PORTA_SMTP", _free_port())
+    monkeypatch.setattr(email_worker, "SMTP_TIMEOUT_SECONDS", 2)
+    queue = FakeQueue([_email("a", "one@example.com")])
+
+    _process_batch(queue, session, monkeypatch)
+
+    assert queue.sent == []
+    assert "ConnectionRefusedError" in queue.failed["a"]